@@ -0,0 +1,888 @@
+"""
+Micro-benchmarks for the Agenda data layer.
+
+Usage:
+    python benchmark.py connections [--tasks 10000] [--tabs 20]
+    python benchmark.py tab_load [--tasks 10000] [--tabs 20]
+    python benchmark.py startup [--tasks 3000] [--tabs 30]
+    python benchmark.py tab_open [--tasks 5000]
+    python benchmark.py memory [--tasks 2000]
+    python benchmark.py stats [--tasks 10000]
+    python benchmark.py chart [--tasks 10000]
+    python benchmark.py saves [--tasks 200]
+    python benchmark.py debounce [--tasks 50]
+    python benchmark.py checklist [--tasks 200]
+    python benchmark.py search [--tasks 100000]
+    python benchmark.py positions [--tasks 2000]
+    python benchmark.py rename [--tasks 100000]
+    python benchmark.py delete [--tasks 2000]
+    python benchmark.py settings
+    python benchmark.py hover [--seconds 5]
+    python benchmark.py imports
+    python benchmark.py due [--tasks 10000]
+    python benchmark.py notifications [--tasks 1000]
+    python benchmark.py reorder [--tasks 5000]
+    python benchmark.py metrics [--tasks 2000]
+
+Every benchmark runs against a throwaway database inside a temporary
+directory, so the real agenda.db is never touched.
+"""
+import argparse
+import os
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+# main.py resolve APP_DATA_DIR a partir de APPDATA na importação
+os.environ.setdefault('APPDATA', tempfile.gettempdir())
+
+import main
+from main import db
+
+
+def use_database(directory):
+    """Points the `db` shim at a database inside `directory`."""
+    db.close()
+    main.APP_DATA_DIR = directory
+    main.DB_PATH = os.path.join(directory, 'agenda.db')
+    main.ATTACHMENTS_DIR = os.path.join(directory, 'attachments')
+    db.init_db()
+
+
+def populate(n_tasks, n_tabs, checklist_per_task=2, seed=42):
+    """Fills the current database with a synthetic workload."""
+    rng = random.Random(seed)
+    months = list(main.MONTHS.values())
+    tab_names = [f"Tab {i + 1}" for i in range(n_tabs)]
+    with db.connection() as conn:
+        conn.executemany("INSERT OR IGNORE INTO tabs (name) VALUES (?)", [(n,) for n in tab_names])
+        tab_ids = dict(conn.execute("SELECT name, id FROM tabs").fetchall())
+        for i in range(n_tasks):
+            day, month, year = rng.randint(1, 28), rng.choice(months), rng.randint(2025, 2027)
+            start_date, end_date = f"{day:02d}/{month}/{year}", f"{day:02d}/{month}/{year + 1}"
+            c = conn.execute(
+                "INSERT INTO tasks (tab_id, title, task, start_date, end_date, status, priority, position) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (tab_ids[tab_names[i % n_tabs]], f"TASK {i}", f"Description for task {i}", start_date, end_date,
+                 rng.choice(["Ongoing", "Complete"]), rng.choice(list(main.AgendaTab.PRIORITY_ORDER)),
+                 (i + 1) * main.POSITION_GAP))
+            task_id = c.lastrowid
+            conn.executemany("INSERT INTO checklist_items (task_id, text, is_checked) VALUES (?, ?, ?)",
+                             [(task_id, f"Item {j}", j % 2) for j in range(checklist_per_task)])
+    return tab_names
+
+
+def _timed(label, func, repeat=3, unit="query"):
+    """Runs `func` (which returns how many units of work it did) and prints the best time."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        count = func()
+        best = min(best, time.perf_counter() - start)
+    print(f"  {label:<28} {best * 1000:9.1f} ms  ({count} x {unit}, {best / count * 1e6:.1f} us/{unit})")
+    return best
+
+
+def bench_connections(args):
+    """Per-call sqlite3.connect (the old shim) vs. pooled connections, simulating a full tab load."""
+    with tempfile.TemporaryDirectory() as tmp:
+        use_database(tmp)
+        tab_names = populate(args.tasks, args.tabs)
+        print(f"Loading {args.tasks} tasks across {args.tabs} tabs (list_tasks + checklist + attachments per task)")
+
+        def per_call_connect():
+            def query(sql, params):
+                conn = sqlite3.connect(main.DB_PATH)
+                rows = conn.execute(sql, params).fetchall()
+                conn.close()
+                return rows
+            calls = 0
+            for name in tab_names:
+                rows = query("SELECT id, title, task, start_date, end_date, status, priority FROM tasks WHERE tab_id = (SELECT id FROM tabs WHERE name = ?)", (name,))
+                calls += 1
+                for row in rows:
+                    query("SELECT id, text, is_checked FROM checklist_items WHERE task_id = ?", (row[0],))
+                    query("SELECT id, file_path FROM attachments WHERE task_id = ?", (row[0],))
+                    calls += 2
+            return calls
+
+        def pooled():
+            calls = 0
+            for name in tab_names:
+                tasks = db.list_tasks(name)
+                calls += 1
+                for t in tasks:
+                    db.list_checklist_items(t["id"])
+                    db.list_attachments(t["id"])
+                    calls += 2
+            return calls
+
+        legacy = _timed("per-call connect", per_call_connect)
+        current = _timed("pooled (db shim)", pooled)
+        print(f"  speedup: {legacy / current:.1f}x")
+        db.close()
+
+
+def bench_tab_load(args):
+    """Per-task checklist/attachment queries (N+1) vs. the db.load_all_tasks bulk loader."""
+    with tempfile.TemporaryDirectory() as tmp:
+        use_database(tmp)
+        tab_names = populate(args.tasks, args.tabs)
+        print(f"Loading {args.tasks} tasks across {args.tabs} tabs with checklists and attachments")
+
+        def per_task():
+            calls = 0
+            for name in tab_names:
+                for t in db.list_tasks(name):
+                    db.list_checklist_items(t["id"])
+                    db.list_attachments(t["id"])
+                    calls += 2
+                calls += 1
+            return calls
+
+        def bulk():
+            db.load_all_tasks()
+            return 3
+
+        legacy = _timed("N+1 per task", per_task)
+        current = _timed("db.load_all_tasks", bulk)
+        print(f"  speedup: {legacy / current:.1f}x")
+        db.close()
+
+
+def _make_tab(name):
+    return main.AgendaTab(name, lambda tab_name: None, None, None, lambda: False, lambda x: x, 12)
+
+
+def bench_startup(args):
+    """Time until the selected tab is usable: hydrate every tab (old load_tabs) vs. lazy hydration."""
+    with tempfile.TemporaryDirectory() as tmp:
+        use_database(tmp)
+        tab_names = populate(args.tasks, args.tabs)
+        print(f"Opening {args.tabs} tabs holding {args.tasks} tasks")
+
+        def eager():
+            tasks_by_tab = db.load_all_tasks()
+            for name in tab_names:
+                _make_tab(name).load_tasks(tasks_by_tab.get(name, []))
+            return len(tab_names)
+
+        def lazy():
+            tasks_by_tab = db.load_all_tasks()
+            for i, name in enumerate(tab_names):
+                tab = _make_tab(name)
+                if i == 0:
+                    tab.load_tasks(tasks_by_tab.get(name, []))
+                else:
+                    tab.defer_tasks(tasks_by_tab.get(name, []))
+            return len(tab_names)
+
+        legacy = _timed("hydrate all tabs", eager, repeat=1, unit="tab")
+        current = _timed("hydrate selected tab only", lazy, repeat=1, unit="tab")
+        print(f"  speedup: {legacy / current:.1f}x")
+        db.close()
+
+
+def bench_tab_open(args):
+    """Opening one large tab: build every TaskRow vs. the windowed list (AgendaTab.ROW_WINDOW)."""
+    with tempfile.TemporaryDirectory() as tmp:
+        use_database(tmp)
+        populate(args.tasks, 1)
+        tasks = db.load_all_tasks()["Tab 1"]
+        print(f"Opening one tab with {args.tasks} tasks")
+        window = main.AgendaTab.ROW_WINDOW
+
+        def open_tab(materialize_all=False):
+            tab = _make_tab("Tab 1")
+            tab.load_tasks(tasks)
+            if materialize_all:
+                tab.render_all()
+            return len(tab.ongoing_list.controls) + len(tab.complete_list.controls)
+
+        legacy = _timed("all rows materialized", lambda: open_tab(True), repeat=1, unit="row")
+        current = _timed(f"windowed ({window} per list)", open_tab, repeat=1, unit="row")
+        print(f"  speedup: {legacy / current:.1f}x")
+        db.close()
+
+
+def _allocated(build):
+    """Bytes still allocated by the objects `build` returns."""
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    objects = build()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    size = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    return size, len(objects)
+
+
+def bench_memory(args):
+    """Memory per task: TaskRow widgets vs. raw row dicts vs. the slotted Task model."""
+    with tempfile.TemporaryDirectory() as tmp:
+        use_database(tmp)
+        populate(args.tasks, 1, checklist_per_task=0)
+        tasks = db.list_tasks("Tab 1")
+        print(f"Keeping {args.tasks} tasks in memory")
+
+        def rows():
+            return [main.TaskRow(None, None, None, None, None, model=main.Task.from_dict(t)) for t in tasks]
+
+        def dicts():
+            return [dict(t) for t in tasks]
+
+        def models():
+            return [main.Task.from_dict(t) for t in tasks]
+
+        results = {}
+        for label, build in (("TaskRow widget", rows), ("dict", dicts), ("Task model", models)):
+            size, count = _allocated(build)
+            results[label] = size / count
+            print(f"  {label:<28} {size / 1024:9.1f} KiB  ({size / count:.0f} bytes/task)")
+        print(f"  TaskRow / Task: {results['TaskRow widget'] / results['Task model']:.0f}x")
+        db.close()
+
+
+def bench_stats(args):
+    """Overview counters after an edit: full recount vs. the incremental TaskStore counters."""
+    with tempfile.TemporaryDirectory() as tmp:
+        use_database(tmp)
+        populate(args.tasks, 1, checklist_per_task=0)
+        store = main.TaskStore(main.Task.from_dict(t) for t in db.list_tasks("Tab 1"))
+        task = next(iter(store))
+        edits = 1000
+        print(f"{edits} status edits on a tab with {args.tasks} tasks")
+
+        def edit_and(count):
+            def run():
+                for i in range(edits):
+                    task.update({"status": "Complete" if i % 2 else "Ongoing"})
+                    count()
+                return edits
+            return run
+
+        legacy = _timed("full recount", edit_and(store.recount), unit="edit")
+        current = _timed("incremental counters", edit_and(store.counts), unit="edit")
+        print(f"  speedup: {legacy / current:.1f}x")
+        db.close()
+
+
+def _legacy_monthly_counts(tasks, series, year, now):
+    """The per-task loop `AgendaTab._update_chart` used before the TaskStore histogram."""
+    counts = [0] * 12
+    for task in tasks:
+        start, end, status = task.start, task.end, task.status.lower()
+        if series == "total" and start and start.year == year:
+            counts[start.month - 1] += 1
+        elif series == "ongoing" and status == "ongoing" and start and start.year == year:
+            counts[start.month - 1] += 1
+        elif series == "completed" and status == "complete" and end and end.year == year:
+            counts[end.month - 1] += 1
+        elif series == "overdue" and status != "complete" and end and end.year == year and end.replace(hour=23, minute=59) < now:
+            counts[end.month - 1] += 1
+    return counts
+
+
+def bench_chart(args):
+    """Monthly chart series: re-bucketing every task vs. the TaskStore histogram."""
+    with tempfile.TemporaryDirectory() as tmp:
+        use_database(tmp)
+        populate(args.tasks, 1, checklist_per_task=0)
+        store = main.TaskStore(main.Task.from_dict(t) for t in db.list_tasks("Tab 1"))
+        now = datetime.now()
+        today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        series = ("total", "ongoing", "completed", "overdue")
+        print(f"Chart series for {len(store.years)} years of {args.tasks} tasks")
+
+        for name in series:
+            for year in store.years:
+                assert store.monthly_counts(name, year, today) == _legacy_monthly_counts(store, name, year, now), (name, year)
+
+        def recompute(func):
+            def run():
+                for name in series:
+                    func(name, now.year)
+                return len(series)
+            return run
+
+        legacy = _timed("bucket every task", recompute(lambda name, year: _legacy_monthly_counts(store, name, year, now)), unit="chart")
+        current = _timed("histogram lookup", recompute(lambda name, year: store.monthly_counts(name, year, today)), unit="chart")
+        print(f"  speedup: {legacy / current:.1f}x")
+        db.close()
+
+
+def bench_saves(args):
+    """Auto-save bursts: one synchronous commit per save vs. the db.writes write-behind queue."""
+    with tempfile.TemporaryDirectory() as tmp:
+        use_database(tmp)
+        populate(args.tasks, 1)
+        tasks = db.load_all_tasks()["Tab 1"]
+        saves_per_task = 10
+        print(f"{saves_per_task} saves of each of {len(tasks)} tasks (task row + checklist items)")
+
+        def saves(write):
+            def run():
+                for i in range(saves_per_task):
+                    for t in tasks:
+                        write(("task", t["id"]), db.update_task, t["id"], f"{t['title']} {i}", t["task"], t["start_date"],
+                              t["end_date"], t["status"], t["priority"])
+                        for item in t["checklist"]:
+                            write(("checklist_item", item["id"]), db.update_checklist_item, item["id"], f"{item['text']} {i}", item["is_checked"])
+                db.writes.flush()
+                return saves_per_task * len(tasks)
+            return run
+
+        legacy = _timed("commit per save", saves(lambda key, func, *a: func(*a)), unit="save")
+        current = _timed("write-behind queue", saves(db.writes.submit), unit="save")
+        print(f"  speedup: {legacy / current:.1f}x")
+        db.close()
+
+
+def bench_debounce(args):
+    """Keystroke debouncing: a threading.Timer per keystroke vs. the shared Scheduler."""
+    keystrokes = 40
+    print(f"{keystrokes} keystrokes in each of {args.tasks} task rows")
+
+    def timers():
+        pending = {}
+        for _ in range(keystrokes):
+            for row in range(args.tasks):
+                if row in pending:
+                    pending[row].cancel()
+                pending[row] = threading.Timer(60, lambda: None)
+                pending[row].start()
+        for timer in pending.values():
+            timer.cancel()
+        return keystrokes * args.tasks
+
+    def scheduled():
+        scheduler = main.Scheduler()
+        for _ in range(keystrokes):
+            for row in range(args.tasks):
+                scheduler.cancel(("auto_save", row))
+                scheduler.call_later(60, lambda: None, key=("auto_save", row))
+        return keystrokes * args.tasks
+
+    legacy = _timed("Timer thread per keystroke", timers, repeat=1, unit="keystroke")
+    current = _timed("shared Scheduler", scheduled, repeat=1, unit="keystroke")
+    print(f"  threads started: {keystrokes * args.tasks} vs 1")
+    print(f"  speedup: {legacy / current:.1f}x")
+
+
+def bench_checklist(args):
+    """Saving a checklist after toggling one box: rewrite every item vs. TaskRow's dirty tracking.
+
+    --tasks is the number of checklist items here.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        use_database(tmp)
+        populate(1, 1, checklist_per_task=args.tasks)
+        task = db.load_all_tasks()["Tab 1"][0]
+        row = main.TaskRow(None, None, None, None, None, model=main.Task.from_dict(task))
+        checkbox = row.checklist_col.controls[0].controls[0]
+        print(f"Toggling one box in a {args.tasks}-item checklist and saving")
+
+        def changed_rows(save):
+            with db.connection() as conn:
+                before = conn.total_changes
+            save()
+            db.writes.flush()
+            with db.connection() as conn:
+                return conn.total_changes - before
+
+        def rewrite_all():
+            checkbox.value = not checkbox.value
+            for item_row in row.checklist_col.controls:
+                db.update_checklist_item(item_row.data, item_row.controls[1].value, item_row.controls[0].value)
+
+        def dirty_only():
+            checkbox.value = not checkbox.value
+            checkbox.on_change(None)
+            row._save_checklist()
+
+        legacy = _timed("update every item", lambda: changed_rows(rewrite_all), unit="row")
+        current = _timed("dirty items only", lambda: changed_rows(dirty_only), unit="row")
+        print(f"  speedup: {legacy / current:.1f}x")
+        db.close()
+
+
+def bench_search(args):
+    """db.search_tasks (FTS5) vs. a LIKE scan over titles, descriptions and checklists."""
+    with tempfile.TemporaryDirectory() as tmp:
+        use_database(tmp)
+        populate(args.tasks, args.tabs)
+        queries = ["task 4217", "description 99", "item 1", "task"]
+        print(f"Searching {args.tasks} tasks for {queries}")
+
+        def like_scan():
+            with db.connection() as conn:
+                for text in queries:
+                    like = f"%{text}%"
+                    conn.execute("""SELECT id FROM tasks WHERE title LIKE ? OR task LIKE ?
+                                    OR id IN (SELECT task_id FROM checklist_items WHERE text LIKE ?) LIMIT 50""",
+                                 (like, like, like)).fetchall()
+            return len(queries)
+
+        def fts():
+            for text in queries:
+                db.search_tasks(text)
+            return len(queries)
+
+        legacy = _timed("LIKE scan", like_scan)
+        current = _timed("db.search_tasks (FTS5)", fts)
+        print(f"  speedup: {legacy / current:.1f}x")
+        db.close()
+
+
+def bench_positions(args):
+    """Persisting a manual move: renumber every task of the tab vs. one sparse position update."""
+    with tempfile.TemporaryDirectory() as tmp:
+        use_database(tmp)
+        populate(args.tasks, 1, checklist_per_task=0)
+        tab = _make_tab("Tab 1")
+        tab.load_tasks(db.load_all_tasks()["Tab 1"])
+        tab.render_all()
+        tab.update_arrow_states = lambda: None  # só a persistência entra na medição
+        rows = tab.ongoing_list.controls
+        moves = 50
+        print(f"{moves} moves in a tab with {args.tasks} tasks")
+
+        def renumber_all():
+            for i in range(moves):
+                tab._move_task(rows[len(rows) // 2], -1 if i % 2 else 1)
+                db.set_task_positions([(index, row.db_id) for index, row in enumerate(rows)])
+            db.writes.flush()
+            return moves
+
+        def sparse():
+            for i in range(moves):
+                tab._move_task(rows[len(rows) // 2], -1 if i % 2 else 1)
+            db.writes.flush()
+            return moves
+
+        legacy = _timed("renumber every row", renumber_all, repeat=1, unit="move")
+        current = _timed("sparse position", sparse, repeat=1, unit="move")
+        print(f"  speedup: {legacy / current:.1f}x")
+        db.close()
+
+
+def bench_rename(args):
+    """Renaming a tab: rows touched and time, now that tasks reference tabs.id."""
+    with tempfile.TemporaryDirectory() as tmp:
+        use_database(tmp)
+        populate(args.tasks, 1, checklist_per_task=0)
+        print(f"Renaming a tab that holds {args.tasks} tasks")
+        names = iter(f"Renamed {i}" for i in range(1000))
+        current = ["Tab 1"]
+
+        def rename():
+            with db.connection() as conn:
+                before = conn.total_changes
+            new_name = next(names)
+            db.update_tab_name(current[0], new_name)
+            current[0] = new_name
+            with db.connection() as conn:
+                return conn.total_changes - before
+
+        _timed("db.update_tab_name", rename, unit="row")
+        db.close()
+
+
+def bench_delete(args):
+    """Deleting a full tab: the per-task loop with inline rmtree vs. the set-based delete."""
+    def fresh_tab(tmp):
+        use_database(tmp)
+        populate(args.tasks, 1, checklist_per_task=5)
+        with db.connection() as conn:
+            task_ids = [row[0] for row in conn.execute("SELECT id FROM tasks")]
+        for task_id in task_ids[::4]:  # um quarto das tasks com anexo
+            folder = os.path.join(main.ATTACHMENTS_DIR, str(task_id))
+            os.makedirs(folder, exist_ok=True)
+            with open(os.path.join(folder, "note.txt"), "w") as f:
+                f.write("x" * 1024)
+        return len(task_ids)
+
+    print(f"Deleting a tab with {args.tasks} tasks (5 checklist items each, a quarter with attachments)")
+
+    def per_task_loop():
+        with tempfile.TemporaryDirectory() as tmp:
+            count = fresh_tab(tmp)
+            start = time.perf_counter()
+            with db.connection() as conn:
+                c = conn.cursor()
+                for (task_id,) in c.execute("SELECT id FROM tasks").fetchall():
+                    folder = os.path.join(main.ATTACHMENTS_DIR, str(task_id))
+                    if os.path.exists(folder):
+                        main.shutil.rmtree(folder)
+                    c.execute("DELETE FROM attachments WHERE task_id = ?", (task_id,))
+                    c.execute("DELETE FROM checklist_items WHERE task_id = ?", (task_id,))
+                    c.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
+                c.execute("DELETE FROM tabs WHERE name = ?", ("Tab 1",))
+            elapsed = time.perf_counter() - start
+            db.close()
+        return count, elapsed
+
+    def set_based():
+        with tempfile.TemporaryDirectory() as tmp:
+            count = fresh_tab(tmp)
+            start = time.perf_counter()
+            db.delete_tab("Tab 1")
+            elapsed = time.perf_counter() - start
+            db.attachment_cleaner.join()  # as pastas saem depois, fora da medição da UI
+            db.close()
+        return count, elapsed
+
+    results = {}
+    for label, func in (("per-task loop + rmtree", per_task_loop), ("set-based delete", set_based)):
+        count, best = min((func() for _ in range(3)), key=lambda result: result[1])
+        results[label] = best
+        print(f"  {label:<28} {best * 1000:9.1f} ms  ({count} x task, {best / count * 1e6:.1f} us/task)")
+    print(f"  speedup: {results['per-task loop + rmtree'] / results['set-based delete']:.1f}x")
+
+
+def bench_settings(args):
+    """Carousel ticks reading their settings from SQLite vs. from the in-memory cache."""
+    keys = ['carousel_show_progress', 'carousel_show_total', 'carousel_show_ongoing', 'carousel_show_completed',
+            'carousel_show_overdue', 'carousel_speed', 'carousel_transition']
+    with tempfile.TemporaryDirectory() as tmp:
+        use_database(tmp)
+        for key in keys[:-2]:
+            db.set_setting(key, True)
+        db.set_setting('carousel_speed', 5)
+        ticks = 2000
+        print(f"{ticks} carousel ticks, {len(keys)} settings read per tick")
+
+        def from_sqlite():
+            for _ in range(ticks):
+                for key in keys:
+                    with db.connection() as conn:
+                        conn.execute("SELECT value FROM settings WHERE key = ?", (key,)).fetchone()
+            return ticks
+
+        def from_cache():
+            for _ in range(ticks):
+                for key in keys:
+                    db.get_setting(key)
+            return ticks
+
+        legacy = _timed("SELECT per read", from_sqlite, unit="tick")
+        current = _timed("settings cache", from_cache, unit="tick")
+        print(f"  speedup: {legacy / current:.1f}x")
+        db.close()
+
+
+def bench_hover(args):
+    """Idle wakeups of the mouse check: the fixed 10 Hz poll vs. HoverWatcher's backoff poll."""
+    seconds = args.seconds
+    print(f"Cursor parked outside the mini window for {seconds:.0f} s")
+    position, bounds = (5, 5), (500, 500, 100, 100)
+
+    def fixed_poll():
+        wakeups = 0
+        stop = time.monotonic() + seconds
+        while time.monotonic() < stop:
+            time.sleep(0.1)
+            wakeups += 1
+            mx, my = position
+            x0, y0, width, height = bounds
+            x0 <= mx <= x0 + width and y0 <= my <= y0 + height
+        return wakeups
+
+    def backoff_poll():
+        watcher = main.HoverWatcher(
+            get_position=lambda: position, get_bounds=lambda: bounds, is_large=lambda: False,
+            can_toggle=lambda: True, on_expand=lambda: None, on_shrink=lambda: None)
+        watcher.start()
+        time.sleep(seconds)
+        watcher.stop()
+        return watcher.wakeups
+
+    results = {}
+    for label, func in (("fixed 10 Hz poll", fixed_poll), ("hover + backoff poll", backoff_poll)):
+        cpu = time.process_time()
+        wakeups = func()
+        cpu = time.process_time() - cpu
+        results[label] = wakeups
+        print(f"  {label:<28} {wakeups:6d} wakeups  ({wakeups / seconds:.2f}/s, {cpu * 1000:.1f} ms CPU)")
+    print(f"  wakeups cut: {results['fixed 10 Hz poll'] / max(results['hover + backoff poll'], 1):.1f}x")
+
+
+def _import_times(statement):
+    """Runs `statement` under `python -X importtime`; returns {module: (self_us, cumulative_us, depth)}."""
+    env = {**os.environ, "APPDATA": os.environ["APPDATA"]}
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", statement],
+                            cwd=os.path.dirname(os.path.abspath(__file__)), env=env,
+                            capture_output=True, text=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        # A linha sai depois dos filhos; a indentação dá a profundidade (0 = importado pelo próprio statement)
+        times[name.strip()] = (int(self_us), int(cumulative_us), (len(name) - len(name.lstrip()) - 1) // 2)
+    return times
+
+
+def bench_imports(args):
+    """`-X importtime` report for `import main`: total against IMPORT_BUDGET_MS and the heaviest top-level imports."""
+    times = _import_times("import main")
+    if "main" not in times:
+        print("import main failed; run `python -c 'import main'` to see the error")
+        return
+    total_ms = times["main"][1] / 1000
+    print(f"import main: {total_ms:.0f} ms (budget {main.IMPORT_BUDGET_MS} ms)")
+    # Filhos diretos de main: as entradas de profundidade 1 depois do último import de topo anterior a main
+    direct = []
+    for name, (_, cumulative, depth) in times.items():
+        if depth == 0 and name != "main":
+            direct = []
+        elif depth == 1:
+            direct.append((name, cumulative))
+    for name, cumulative in sorted(direct, key=lambda item: -item[1])[:10]:
+        print(f"  {name:<28} {cumulative / 1000:9.1f} ms")
+    deferred = ["pyautogui", "ctypes", "random", "tkinter"]
+    print("  deferred modules still pulled in by dependencies: " + (", ".join(m for m in deferred if m in times) or "none"))
+    for module in deferred:
+        cost = _import_times(f"import {module}").get(module)
+        print(f"  import {module:<21} {f'{cost[1] / 1000:9.1f} ms' if cost else '   failed (no display?)'}")
+
+
+def bench_due(args):
+    """Due-date checks: the old hourly scan of every row vs. the midnight pop of the deadline heap, and when each fires."""
+    with tempfile.TemporaryDirectory() as tmp:
+        use_database(tmp)
+        populate(args.tasks, 1, checklist_per_task=0)
+        tab = _make_tab("Tab 1")
+        tab.load_tasks(db.load_all_tasks()["Tab 1"])
+        tab.render_all()  # o checker antigo percorria as TaskRows, todas construídas na abertura
+        tab.refresh_due_dates()
+        midnight = main.TaskStore._midnight() + timedelta(days=1, seconds=1)
+        print(f"A day of due-date checks in a tab with {args.tasks} tasks ({len(main.due_dates)} scheduled)")
+        parse_uncached = main.parse_task_date.__wrapped__
+
+        def check_all_due_dates():
+            # O AgendaApp.check_all_due_dates anterior: relê e reparseia a data de cada row e reaplica o badge
+            for task_row in tab.ongoing_list.controls:
+                if task_row.status_field.value != "Ongoing":
+                    task_row.set_notification_status(None)
+                    continue
+                end_date_str = task_row.end_date_field.value
+                if not (end_date_str and (end_date := parse_uncached(end_date_str))):
+                    task_row.set_notification_status(None)
+                    continue
+                days_diff = (end_date - datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)).days
+                status = "overdue" if days_diff < 0 else "upcoming" if 0 <= days_diff <= 3 else None
+                task_row.set_notification_status(status, days_diff)
+            tab.update_overview_stats()
+
+        def hourly_scan():
+            for _ in range(24):
+                check_all_due_dates()
+            return 24
+
+        touched = []
+
+        def midnight_pop():
+            tasks = main.due_dates.pop_due(midnight)
+            tab.refresh_due_dates(tasks=tasks)
+            touched.append(len(tasks))
+            return 1
+
+        legacy = _timed("24 hourly full scans", hourly_scan, repeat=1, unit="scan")
+        current = _timed("midnight heap pop", midnight_pop, repeat=1, unit="day")
+        print(f"  tasks touched at midnight: {touched[0]} of {args.tasks}")
+        print(f"  speedup: {legacy / current:.1f}x")
+
+        # Quando a virada chega à UI: o relógio de main é adiantado para 1 s antes da próxima
+        # meia-noite e o timer real do scheduler dispara o DueDateScheduler
+        now = datetime.now()
+        next_midnight = now.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+        offset = next_midnight - now - timedelta(seconds=1)
+
+        class ShiftedClock(datetime):
+            @classmethod
+            def now(cls, tz=None):
+                return datetime.now(tz) + offset
+
+        fired = threading.Event()
+        lateness = []
+
+        def on_due(tasks):
+            lateness.append((main.datetime.now() - next_midnight).total_seconds())
+            fired.set()
+
+        real_datetime, main.datetime = main.datetime, ShiftedClock
+        main.due_dates.listeners.append(on_due)
+        try:
+            tab.refresh_due_dates()  # rearma o timer com o relógio adiantado
+            fired.wait(10)
+        finally:
+            main.due_dates.listeners.remove(on_due)
+            main.datetime = real_datetime
+        if lateness:
+            print(f"  badges updated {lateness[0] * 1000:.1f} ms after midnight (measured)")
+        else:
+            print("  midnight timer did not fire within 10 s")
+        print("  the hourly checker slept 3600 s from app start, so it picked up a midnight change"
+              " anywhere from 0 s to 1 h late depending on when the app was opened")
+        db.close()
+
+
+def bench_notifications(args):
+    """Re-applying unchanged due badges: row updates sent and time, interpolating per call vs. palette + change check."""
+    with tempfile.TemporaryDirectory() as tmp:
+        use_database(tmp)
+        _bench_notifications(args)
+        db.close()
+
+
+def _bench_notifications(args):
+    rows = [main.TaskRow(None, None, None, None, None, title=f"TASK {i}", model=main.Task(i, f"TASK {i}")) for i in range(args.tasks)]
+    states = [("overdue", -(i % 30) - 1) if i % 2 else ("upcoming", i % 4) for i in range(args.tasks)]
+    updates = [0]
+
+    def count_update(self):
+        updates[0] += 1
+    original_update, main.TaskRow.update = main.TaskRow.update, count_update
+    print(f"Sweeping {args.tasks} rows whose badge did not change")
+
+    def legacy_color(days_diff):
+        orange, red = (255, 167, 38), (239, 83, 80)
+        factor = (3 - days_diff) / 3.0
+        r, g, b = (int(o + (d - o) * factor) for o, d in zip(orange, red))
+        return f"#{r:02x}{g:02x}{b:02x}"
+
+    def legacy_sweep():
+        updates[0] = 0
+        for row, (status, days_diff) in zip(rows, states):
+            color = legacy_color(days_diff) if status == "upcoming" else main.ft.Colors.RED_400
+            info = row.minimized_due_date_info
+            info.visible, info.controls[0].color, info.controls[1].color = True, color, color
+            row.update()
+        return len(rows)
+
+    def current_sweep():
+        updates[0] = 0
+        for row, (status, days_diff) in zip(rows, states):
+            row.set_notification_status(status, days_diff)
+        return len(rows)
+
+    current_sweep()  # primeiro desenho de cada badge
+    legacy = _timed("interpolate + update", legacy_sweep, unit="row")
+    print(f"    updates sent: {updates[0]}")
+    current = _timed("palette + change check", current_sweep, unit="row")
+    print(f"    updates sent: {updates[0]}")
+    print(f"  speedup: {legacy / current:.1f}x")
+    main.TaskRow.update = original_update
+
+
+def bench_reorder(args):
+    """Latency of one manual move and row updates sent, against list length: full arrow pass vs. edge rows only."""
+    updates = [0]
+
+    def count_update(self):
+        updates[0] += 1
+
+    def legacy_arrow_states(tab):
+        for lst in (tab.ongoing_list, tab.complete_list):
+            controls = lst.controls
+            for i, row in enumerate(controls):
+                row.move_up_btn.disabled = (i == 0)
+                row.move_down_btn.disabled = (i == len(controls) - 1)
+                row.update()
+
+    original_update, main.TaskRow.update = main.TaskRow.update, count_update
+    moves = 50
+    print(f"{moves} moves of a middle row (plus one onto the top edge) per list length")
+    for n in sorted({min(n, args.tasks) for n in (100, 1000, args.tasks)}):
+        with tempfile.TemporaryDirectory() as tmp:
+            use_database(tmp)
+            populate(n, 1, checklist_per_task=0)
+            tab = _make_tab("Tab 1")
+            tab.load_tasks(db.load_all_tasks()["Tab 1"])
+            tab.render_all()
+            rows = tab.ongoing_list.controls
+            print(f"  {len(rows)} rows in the list")
+
+            def run(arrow_states):
+                updates[0] = 0
+                tab.update_arrow_states = arrow_states
+                for i in range(moves):
+                    tab._move_task(rows[len(rows) // 2], -1 if i % 2 else 1)
+                tab._move_task(rows[1], -1)
+                return moves + 1
+
+            legacy = _timed("full arrow pass", lambda: run(lambda: legacy_arrow_states(tab)), repeat=1, unit="move")
+            print(f"    row updates: {updates[0]}")
+            current = _timed("edge rows only", lambda: run(main.AgendaTab.update_arrow_states.__get__(tab)), repeat=1, unit="move")
+            print(f"    row updates: {updates[0]}; speedup {legacy / current:.1f}x")
+            assert rows[0].move_up_btn.disabled and not rows[1].move_up_btn.disabled and rows[-1].move_down_btn.disabled
+            db.close()
+    main.TaskRow.update = original_update
+
+
+def bench_metrics(args):
+    """Overhead of the built-in metrics on the db calls the UI makes most, and what they record."""
+    with tempfile.TemporaryDirectory() as tmp:
+        use_database(tmp)
+        populate(args.tasks, 1, checklist_per_task=2)
+        task_ids = [t["id"] for t in db.load_all_tasks()["Tab 1"]]
+        print(f"{len(task_ids)} checklist loads + setting reads, with and without the db.* timers")
+
+        def calls(list_checklist, get_setting):
+            def run():
+                for task_id in task_ids:
+                    list_checklist(task_id)
+                    get_setting('theme')
+                return len(task_ids)
+            return run
+
+        raw = _timed("uninstrumented", calls(db.list_checklist_items.__wrapped__, db.get_setting), unit="task")
+        main.metrics.reset()
+        instrumented = _timed("instrumented", calls(db.list_checklist_items, db.get_setting), unit="task")
+        print(f"  overhead: {(instrumented - raw) / len(task_ids) * 1e6:.2f} us/timed call")
+        print(main.metrics.summary())
+        db.close()
+
+
+BENCHMARKS = {
+    "connections": bench_connections,
+    "tab_load": bench_tab_load,
+    "startup": bench_startup,
+    "tab_open": bench_tab_open,
+    "memory": bench_memory,
+    "stats": bench_stats,
+    "chart": bench_chart,
+    "saves": bench_saves,
+    "debounce": bench_debounce,
+    "checklist": bench_checklist,
+    "search": bench_search,
+    "positions": bench_positions,
+    "rename": bench_rename,
+    "delete": bench_delete,
+    "settings": bench_settings,
+    "hover": bench_hover,
+    "imports": bench_imports,
+    "due": bench_due,
+    "notifications": bench_notifications,
+    "reorder": bench_reorder,
+    "metrics": bench_metrics,
+}
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("benchmark", choices=sorted(BENCHMARKS))
+    parser.add_argument("--tasks", type=int, default=10000)
+    parser.add_argument("--tabs", type=int, default=20)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args(sys.argv[1:])
+    BENCHMARKS[args.benchmark](args)
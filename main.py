@@ -1,17 +1,51 @@
+import time
+# Início da importação do módulo, referência para o trace de startup
+_IMPORT_STARTED = time.perf_counter()
 import flet as ft
 import sqlite3
-from datetime import datetime
-import pyautogui
+from datetime import datetime, timedelta
 import math
 import threading
-import time
 import os
 import shutil
-import random
 import sys
 import string
-import ctypes
 import asyncio
+import queue
+import heapq
+import itertools
+import bisect
+import json
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from functools import lru_cache
+# pyautogui, ctypes, random e tkinter são importados só onde são usados: pesam no startup
+# (pyautogui sozinho leva centenas de ms e falha sem display no Linux)
+
+# Orçamento de tempo para importar o módulo (o flet sozinho leva a maior parte)
+IMPORT_BUDGET_MS = 800
+IMPORT_TIME_MS = (time.perf_counter() - _IMPORT_STARTED) * 1000
+
+# Fases do startup em ms, na ordem em que rodam; vão para AgendaApp.startup_metrics no fim
+STARTUP_TRACE = {"import_ms": IMPORT_TIME_MS}
+
+@contextmanager
+def startup_phase(name):
+    """Times a startup phase into STARTUP_TRACE[f"{name}_ms"]."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        STARTUP_TRACE[f"{name}_ms"] = (time.perf_counter() - started) * 1000
+
+def report_startup():
+    """Warns when importing the module went over IMPORT_BUDGET_MS; with DEBUG also prints the startup trace."""
+    STARTUP_TRACE["mini_icon_ms"] = (time.perf_counter() - _IMPORT_STARTED) * 1000
+    if DEBUG:
+        print("Startup: " + ", ".join(f"{name[:-3]} {ms:.0f} ms" for name, ms in STARTUP_TRACE.items()))
+    if IMPORT_TIME_MS > IMPORT_BUDGET_MS:
+        print(f"Warning: importing main took {IMPORT_TIME_MS:.0f} ms, over the {IMPORT_BUDGET_MS} ms budget "
+              f"(run `python benchmark.py imports` to see which modules)")
 
 APP_NAME = "Todo APP"
 VERSION = "1.1.0"
@@ -20,6 +54,19 @@ APP_DATA_DIR = os.path.join(os.getenv('APPDATA'), APP_NAME)
 DB_PATH = os.path.join(APP_DATA_DIR, 'agenda.db')
 ATTACHMENTS_DIR = os.path.join(APP_DATA_DIR, 'attachments')
 
+# Perfil de desempenho do SQLite, aplicado em cada conexão do pool.
+# WAL deixa as leituras (carousel, checker) rodarem durante um commit do auto-save.
+DB_PRAGMA_PROFILE = {
+    "journal_mode": "wal",
+    "synchronous": "normal",
+    "cache_size": -16000,          # valores negativos são KiB (~16 MB)
+    "mmap_size": 64 * 1024 * 1024,
+    "temp_store": "memory",
+}
+
+# AGENDA_DEBUG=1 liga verificações extras (ex.: contadores incrementais vs. recontagem completa)
+DEBUG = os.environ.get("AGENDA_DEBUG") == "1"
+
 DRACULA_THEME = ft.Theme(
     color_scheme=ft.ColorScheme(
         background="#312447",
@@ -50,6 +97,8 @@ def set_window_icon(page_title="TODO", icon_path="list.ico"):
     Define o ícone da janela e da barra de tarefas usando a API do Windows.
     """
     try:
+        import ctypes
+
         # Constantes da API do Windows
         GWL_HICON = -14
         WM_SETICON = 0x0080
@@ -169,20 +218,29 @@ def set_window_icon(page_title="TODO", icon_path="list.ico"):
         
     return False
 
+def _set_process_dpi_aware():
+    """Makes the process DPI aware on Windows so sizes and DPI come back in physical pixels."""
+    import ctypes
+    # Set process DPI awareness to System Aware (1)
+    # This is crucial for getting the correct DPI value in scaled displays.
+    try:
+        ctypes.windll.shcore.SetProcessDpiAwareness(1)
+    except (AttributeError, OSError):
+        # Fallback for older Windows versions
+        ctypes.windll.user32.SetProcessDPIAware()
+
 def get_auto_dpi_scale(base_dpi=96):
     """
     Calculates the UI scale factor based on the screen's DPI.
     Uses ctypes on Windows to avoid tkinter dependency issues in executables.
+    Elsewhere the value is cached in the 'auto_dpi_scale' setting, since that
+    path has to start a whole tkinter.Tk() to read it; the cache is keyed by
+    the screen size and measured again when the screen changes.
     """
     try:
         if sys.platform == "win32":
-            # Set process DPI awareness to System Aware (1)
-            # This is crucial for getting the correct DPI value in scaled displays.
-            try:
-                ctypes.windll.shcore.SetProcessDpiAwareness(1)
-            except (AttributeError, OSError):
-                # Fallback for older Windows versions
-                ctypes.windll.user32.SetProcessDPIAware()
+            import ctypes
+            _set_process_dpi_aware()
             
             # Get DPI
             LOGPIXELSX = 88  # Horizontal DPI
@@ -190,16 +248,36 @@ def get_auto_dpi_scale(base_dpi=96):
             dpi = ctypes.windll.gdi32.GetDeviceCaps(hDC, LOGPIXELSX)
             ctypes.windll.user32.ReleaseDC(0, hDC)
             return dpi / base_dpi
-        else: # Fallback for other OS (macOS, Linux)
-            import tkinter as tk
-            root = tk.Tk()
-            root.withdraw()
-            dpi = root.winfo_fpixels('1i')
-            root.destroy()
-            return dpi / base_dpi
+        # Fallback for other OS (macOS, Linux)
+        screen = "x".join(str(size) for size in get_screen_size())
+        cached = db.settings.get_float('auto_dpi_scale', 0.0)
+        if cached > 0 and db.settings.get('auto_dpi_screen') == screen:
+            return cached
+        import tkinter as tk
+        root = tk.Tk()
+        root.withdraw()
+        dpi = root.winfo_fpixels('1i')
+        root.destroy()
     except Exception as e:
         print(f"Could not determine screen DPI, falling back to 1.0. Error: {e}")
         return 1.0
+    db.set_setting('auto_dpi_scale', dpi / base_dpi)
+    db.set_setting('auto_dpi_screen', screen)
+    return dpi / base_dpi
+
+def get_screen_size():
+    """Screen size in pixels: ctypes on Windows, pyautogui elsewhere (imported here, it is slow to load)."""
+    if sys.platform == "win32":
+        import ctypes
+        _set_process_dpi_aware()
+        user32 = ctypes.windll.user32
+        return user32.GetSystemMetrics(0), user32.GetSystemMetrics(1)
+    import pyautogui
+    return pyautogui.size()
+
+def get_cursor_position():
+    import pyautogui
+    return pyautogui.position()
 
 def calculate_window_positions(scale_func, min_margin_base=600):
     """
@@ -217,7 +295,7 @@ def calculate_window_positions(scale_func, min_margin_base=600):
         tuple: (base_left_small, base_left_large, base_top)
     """
     try:
-        screen_w, screen_h = pyautogui.size()
+        screen_w, screen_h = get_screen_size()
         
         # Calculate window sizes (scaled)
         small_width = scale_func(100)
@@ -245,156 +323,1037 @@ def calculate_window_positions(scale_func, min_margin_base=600):
         # Fallback values that should work on most screens
         return 1000, 400, 30
 
+# ---- Métricas ----
+class Metrics:
+    """Process-wide latency histograms, call counts and byte totals keyed by operation name.
+
+    `timed(name)` works as a context manager and as a decorator; `wrap(name,
+    func)` instruments an existing function. `snapshot()` returns plain dicts,
+    which is also what `export()` writes as JSON so two releases can be diffed.
+    """
+
+    # Limites superiores (ms) dos baldes do histograma; o último balde é "acima de 1 s"
+    BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.context = {}
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._stats = {}
+            self.started = datetime.now()
+
+    def add_context(self, **sections):
+        """Extra sections written with every export (e.g. the startup trace), read at export time."""
+        self.context.update(sections)
+
+    def record(self, name, seconds=None, nbytes=0):
+        """Counts one call of `name`; `seconds` goes into its histogram, `nbytes` into its byte total."""
+        with self._lock:
+            stat = self._stats.get(name)
+            if stat is None:
+                stat = self._stats[name] = {"count": 0, "timed": 0, "total_ms": 0.0, "max_ms": 0.0, "bytes": 0,
+                                            "histogram": [0] * (len(self.BUCKETS_MS) + 1)}
+            stat["count"] += 1
+            stat["bytes"] += nbytes
+            if seconds is not None:
+                ms = seconds * 1000
+                stat["timed"] += 1
+                stat["total_ms"] += ms
+                stat["max_ms"] = max(stat["max_ms"], ms)
+                stat["histogram"][bisect.bisect_left(self.BUCKETS_MS, ms)] += 1
+
+    @contextmanager
+    def timed(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def wrap(self, name, func):
+        def timed_call(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.record(name, time.perf_counter() - started)
+        timed_call.__name__, timed_call.__doc__, timed_call.__wrapped__ = func.__name__, func.__doc__, func
+        return timed_call
+
+    @classmethod
+    def percentile(cls, stat, fraction):
+        """Upper bound (ms) of the histogram bucket holding the `fraction` quantile, capped at the max."""
+        target = fraction * stat["timed"]
+        seen = 0
+        for i, count in enumerate(stat["histogram"]):
+            seen += count
+            if count and seen >= target:
+                return min(cls.BUCKETS_MS[i], stat["max_ms"]) if i < len(cls.BUCKETS_MS) else stat["max_ms"]
+        return 0.0
+
+    def snapshot(self):
+        with self._lock:
+            stats = {name: {**stat, "histogram": list(stat["histogram"])} for name, stat in self._stats.items()}
+        for stat in stats.values():
+            stat["p50_ms"] = self.percentile(stat, 0.5)
+            stat["p95_ms"] = self.percentile(stat, 0.95)
+        return stats
+
+    def summary(self, limit=30):
+        """Text table of the operations with the most total time, for the diagnostics panel."""
+        stats = sorted(self.snapshot().items(), key=lambda item: (-item[1]["total_ms"], -item[1]["count"]))
+        lines = [f"{'operation':<32}{'calls':>7}{'p50':>8}{'p95':>8}{'max':>9}{'total':>10}{'KiB':>8}"]
+        for name, stat in stats[:limit]:
+            lines.append(f"{name[:31]:<32}{stat['count']:>7}{stat['p50_ms']:>8.2f}{stat['p95_ms']:>8.2f}"
+                         f"{stat['max_ms']:>9.1f}{stat['total_ms']:>10.1f}{stat['bytes'] / 1024:>8.1f}")
+        return "\n".join(lines)
+
+    def export(self, path):
+        """Writes the snapshot and the context sections as JSON to `path` and returns the path."""
+        data = {
+            "app": APP_NAME,
+            "version": VERSION,
+            "started": self.started.isoformat(timespec="seconds"),
+            "exported": datetime.now().isoformat(timespec="seconds"),
+            "buckets_ms": list(self.BUCKETS_MS),
+            "metrics": self.snapshot(),
+            **self.context,
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, default=str)
+        return path
+
+    def instrument_page(self, page):
+        """Times page.update (and so every control.update) and counts the bytes Flet sends to the client."""
+        update = page.update
+        page.update = self.wrap("page.update", update)
+        conn = page.connection
+        if conn is None or not hasattr(conn, "send_commands"):
+            return
+        send_commands = conn.send_commands
+
+        def counted_send(session_id, commands):
+            self.record("flet.send_commands", None, _command_bytes(commands))
+            return send_commands(session_id, commands)
+        conn.send_commands = counted_send
+
+
+def _command_bytes(commands):
+    """Approximate payload size of a list of Flet protocol commands."""
+    return sum(len(str(command)) + _command_bytes(getattr(command, "commands", None) or ()) for command in commands)
+
+
+# Métricas do processo: db, operações das abas, animações e updates do Flet
+metrics = Metrics()
+
+
+# ---- Conexões SQLite compartilhadas ----
+class ConnectionPool:
+    """Small pool of long-lived SQLite connections shared by every thread.
+
+    The UI thread, the carousel, the due-date checker and the auto-save timers
+    borrow a connection from here instead of opening a new one per call. A
+    thread that already holds a connection gets the same one back on nested
+    use, so `db.delete_tab` -> `db.delete_task` share a single transaction.
+    """
+
+    def __init__(self, path, size=4, timeout=10.0, pragmas=None):
+        self.path = path
+        self.size = size
+        self.timeout = timeout
+        self.pragmas = dict(pragmas or {})
+        self._idle = queue.LifoQueue()
+        self._all = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _open(self):
+        conn = sqlite3.connect(self.path, timeout=self.timeout, check_same_thread=False)
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        return conn
+
+    def _acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if len(self._all) < self.size:
+                conn = self._open()
+                self._all.append(conn)
+                return conn
+        # Pool cheio: espera outra thread devolver uma conexão
+        return self._idle.get()
+
+    @contextmanager
+    def connection(self):
+        """Borrows a connection for the current thread.
+
+        The outermost block commits on success and rolls back on error; nested
+        blocks on the same thread reuse the connection without committing.
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            yield conn
+            return
+
+        conn = self._acquire()
+        self._local.conn = conn
+        try:
+            yield conn
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            self._local.conn = None
+            self._idle.put(conn)
+
+    def close(self):
+        with self._lock:
+            conns, self._all = self._all, []
+        while True:
+            try: self._idle.get_nowait()
+            except queue.Empty: break
+        for conn in conns:
+            try: conn.close()
+            except Exception: pass
+
+class WriteBehindQueue:
+    """Coalesces database writes and applies them from one background thread.
+
+    `submit(key, func, *args)` replaces any pending write with the same key, so
+    a burst of auto-saves of one task becomes a single UPDATE. Everything
+    pending is applied in submit order, in one transaction, `interval` seconds
+    after the first submit or right away by `flush()`.
+
+    A locked or busy database (another instance, an antivirus scan) keeps the
+    writes queued and retries them with a growing delay, up to
+    `MAX_RETRY_DELAY`. Any other error retries the batch one write at a time;
+    a write that still fails is dropped and reported to `error_listeners`
+    as `(key, error)`.
+    """
+
+    MAX_RETRY_DELAY = 30.0
+
+    def __init__(self, connection, interval=0.5):
+        self._connection = connection
+        self.interval = interval
+        self.retry_delay = 0.0  # > 0 enquanto o banco está travado e a fila espera para tentar de novo
+        self._pending = {}
+        self._lock = threading.Lock()        # protege _pending
+        self._flush_lock = threading.Lock()  # um flush por vez, na ordem de chegada
+        self._wake = threading.Event()
+        self._thread = None
+        # Chamados com o número de escritas pendentes sempre que ele muda
+        self.listeners = []
+        # Chamados com (key, erro) quando uma escrita é descartada
+        self.error_listeners = []
+
+    def __len__(self):
+        return len(self._pending)
+
+    def submit(self, key, func, *args):
+        with self._lock:
+            # Reinsere no fim: a escrita mais nova não pode passar na frente das anteriores
+            self._pending.pop(key, None)
+            self._pending[key] = (func, args)
+            count = len(self._pending)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+        self._wake.set()
+        self._notify(count)
+
+    def flush(self):
+        """Applies every pending write now. Returns how many were applied.
+
+        Also waits for a batch the writer thread is applying, so a read made
+        after `flush()` sees every write submitted before it.
+        """
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+            if not batch:
+                return 0
+            applied, retry = 0, {}
+            try:
+                try:
+                    self._apply(batch.values())
+                    applied = len(batch)
+                except Exception as e:
+                    if self._is_transient(e):
+                        retry = batch
+                    else:
+                        print(f"Error flushing {len(batch)} pending writes, retrying one by one: {e}")
+                        # Uma escrita com erro não pode segurar as outras: cada uma na sua vez
+                        for key, write in batch.items():
+                            try:
+                                self._apply([write])
+                                applied += 1
+                            except Exception as e:
+                                if self._is_transient(e):
+                                    retry[key] = write
+                                else:
+                                    self._drop(key, e)
+                if retry:
+                    with self._lock:
+                        # Voltam para a frente da fila, sem passar por cima de uma versão mais nova da mesma escrita
+                        self._pending = {**{k: w for k, w in retry.items() if k not in self._pending}, **self._pending}
+                    self.retry_delay = min(max(self.retry_delay * 2, self.interval), self.MAX_RETRY_DELAY)
+                    self._wake.set()
+                else:
+                    self.retry_delay = 0.0
+                return applied
+            finally:
+                self._notify(len(self._pending))
+
+    @staticmethod
+    def _is_transient(error):
+        # "database is locked" / "database is busy": passa sozinho, a escrita não pode se perder
+        message = str(error).lower()
+        return isinstance(error, sqlite3.OperationalError) and ("locked" in message or "busy" in message)
+
+    def _drop(self, key, error):
+        print(f"Dropping pending write {key!r}: {error}")
+        for listener in list(self.error_listeners):
+            try: listener(key, error)
+            except Exception as e: print(f"Error in write failure listener: {e}")
+
+    def _apply(self, writes):
+        # Savepoint: um erro desfaz só estas escritas, mesmo dentro de uma transação já aberta
+        with self._connection() as conn:
+            conn.execute("SAVEPOINT write_behind")
+            try:
+                for func, args in writes:
+                    func(*args)
+            except BaseException:
+                conn.execute("ROLLBACK TO write_behind")
+                conn.execute("RELEASE write_behind")
+                raise
+            conn.execute("RELEASE write_behind")
+
+    def _notify(self, count):
+        for listener in list(self.listeners):
+            try: listener(count)
+            except Exception as e: print(f"Error in pending writes listener: {e}")
+
+    def _run(self):
+        while True:
+            self._wake.wait()
+            # Junta as escritas que chegarem nesse meio tempo; com o banco travado, espera mais a cada tentativa
+            time.sleep(max(self.interval, self.retry_delay))
+            self._wake.clear()
+            self.flush()
+
+class SettingsCache:
+    """Process-wide copy of the settings table with write-through and change subscribers.
+
+    Every row is read once by `load()`; afterwards reads are dict lookups, so
+    the carousel thread and the dialogs never touch SQLite to read a setting.
+    `set()` writes the row and the cache together and then calls the
+    callbacks subscribed to that key with `(key, value)`.
+    """
+
+    def __init__(self, connection):
+        self._connection = connection
+        self._values = None
+        self._subscribers = {}
+        self._lock = threading.Lock()
+
+    def load(self):
+        with self._connection() as conn:
+            values = dict(conn.execute("SELECT key, value FROM settings").fetchall())
+        with self._lock:
+            self._values = values
+
+    def invalidate(self):
+        """Drops the cache; the next read reloads it (used when the database is swapped)."""
+        with self._lock:
+            self._values = None
+
+    def get(self, key, default=None):
+        values = self._values
+        if values is None:
+            self.load()
+            values = self._values
+        return values.get(key, default)
+
+    def get_bool(self, key, default=False):
+        value = self.get(key)
+        return default if value is None else value == 'True'
+
+    def get_int(self, key, default=0):
+        try:
+            return int(self.get(key, default))
+        except (TypeError, ValueError):
+            return default
+
+    def get_float(self, key, default=0.0):
+        try:
+            return float(self.get(key, default))
+        except (TypeError, ValueError):
+            return default
+
+    def set(self, key, value):
+        value = str(value)
+        if self._values is None:
+            self.load()
+        with self._connection() as conn:
+            conn.execute("INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)", (key, value))
+        with self._lock:
+            changed = self._values.get(key) != value
+            self._values[key] = value
+        if changed:
+            for callback in list(self._subscribers.get(key, ())):
+                try:
+                    callback(key, value)
+                except Exception as e:
+                    print(f"Error notifying setting '{key}': {e}")
+
+    def delete(self, key):
+        with self._connection() as conn:
+            conn.execute("DELETE FROM settings WHERE key = ?", (key,))
+        with self._lock:
+            if self._values is not None:
+                self._values.pop(key, None)
+
+    def subscribe(self, keys, callback):
+        if isinstance(keys, str):
+            keys = (keys,)
+        for key in keys:
+            self._subscribers.setdefault(key, []).append(callback)
+
+    def unsubscribe(self, keys, callback):
+        if isinstance(keys, str):
+            keys = (keys,)
+        for key in keys:
+            try:
+                self._subscribers.get(key, []).remove(callback)
+            except ValueError:
+                pass
+
+
+class AttachmentCleaner:
+    """Removes attachment folders of deleted tasks on a background thread.
+
+    The rows go first, in one transaction; folders are removed afterwards, so
+    a crash can at worst leave an orphaned folder, which `sweep()` clears on
+    the next start.
+    """
+
+    def __init__(self, existing_task_ids):
+        self._existing_task_ids = existing_task_ids  # callable: ids -> subset que ainda existe no banco
+        self._jobs = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def remove(self, task_ids):
+        for task_id in task_ids:
+            self._submit(lambda path=os.path.join(ATTACHMENTS_DIR, str(task_id)): shutil.rmtree(path, ignore_errors=True))
+
+    def sweep(self):
+        """Queues removal of every folder in ATTACHMENTS_DIR whose task no longer exists."""
+        self._submit(self._sweep)
+
+    def join(self):
+        """Blocks until every queued removal has finished."""
+        self._jobs.join()
+
+    def _submit(self, job):
+        self._jobs.put(job)
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+
+    def _sweep(self):
+        if not os.path.isdir(ATTACHMENTS_DIR):
+            return
+        folders = {int(name) for name in os.listdir(ATTACHMENTS_DIR) if name.isdigit()}
+        orphans = folders - set(self._existing_task_ids(folders))
+        for task_id in orphans:
+            shutil.rmtree(os.path.join(ATTACHMENTS_DIR, str(task_id)), ignore_errors=True)
+        if orphans:
+            print(f"Removed {len(orphans)} orphaned attachment folders")
+
+    def _run(self):
+        while True:
+            job = self._jobs.get()
+            try:
+                job()
+            except Exception as e:
+                print(f"Error cleaning attachments: {e}")
+            finally:
+                self._jobs.task_done()
+
+
+class Scheduler:
+    """Runs delayed callbacks from a single thread, ordered by a heap of deadlines.
+
+    `call_later(delay, func, key=...)` replaces any pending call with the same
+    key, which is how debounces (auto-save, hide the save indicator) are
+    expressed without a `threading.Timer` per call. Callbacks run on the
+    scheduler thread, so they must be quick.
+    """
+
+    def __init__(self):
+        self._heap = []      # [deadline, seq, func, key]; func=None marca cancelado
+        self._keyed = {}     # key -> entrada pendente
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def call_later(self, delay, func, key=None):
+        entry = [time.monotonic() + delay, next(self._seq), func, key]
+        with self._cond:
+            if key is not None:
+                old = self._keyed.pop(key, None)
+                if old: old[2] = None
+                self._keyed[key] = entry
+            heapq.heappush(self._heap, entry)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+            self._cond.notify()
+        return entry
+
+    def cancel(self, key):
+        with self._cond:
+            entry = self._keyed.pop(key, None)
+            if entry: entry[2] = None
+
+    def pending(self, key):
+        return key in self._keyed
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while True:
+                    while self._heap and self._heap[0][2] is None:
+                        heapq.heappop(self._heap)
+                    if not self._heap:
+                        self._cond.wait()
+                        continue
+                    timeout = self._heap[0][0] - time.monotonic()
+                    if timeout <= 0:
+                        break
+                    self._cond.wait(timeout)
+                entry = heapq.heappop(self._heap)
+                _, _, func, key = entry
+                if key is not None and self._keyed.get(key) is entry:
+                    del self._keyed[key]
+            try:
+                func()
+            except Exception as e:
+                print(f"Error in scheduled callback {getattr(func, '__name__', func)}: {e}")
+
+# Temporizadores da UI (auto-save, indicadores, fim de animações) compartilham esta thread
+scheduler = Scheduler()
+
+# ---- Datas ----
+# A UI e o banco guardam datas como "05/Jan/2025"; prazos, atrasos e o gráfico
+# comparam os datetimes de parse_task_date no TaskStore em memória.
+MONTHS = {
+    1: "Jan", 2: "Feb", 3: "Mar", 4: "Apr", 5: "May", 6: "Jun",
+    7: "Jul", 8: "Aug", 9: "Sep", 10: "Oct", 11: "Nov", 12: "Dec"
+}
+MONTH_NUMBERS = {v: k for k, v in MONTHS.items()}
+
+@lru_cache(maxsize=4096)
+def parse_task_date(date_str):
+    """Parses a 'dd/Mon/yyyy' string into a datetime, or returns None if invalid."""
+    if not date_str:
+        return None
+    try:
+        parts = date_str.split('/')
+        if len(parts) != 3: return None
+        month = MONTH_NUMBERS.get(parts[1])
+        if not month: return None
+        return datetime(int(parts[2]), month, int(parts[0]))
+    except Exception:
+        return None
+
+# ---- Migrações do schema ----
+# Cada migração leva o banco da versão N-1 para a versão N (PRAGMA user_version).
+# Nunca altere uma migração já publicada: acrescente uma nova no fim da lista.
+def _migration_base_schema(c):
+    # Bancos anteriores ao sistema de migrações estão na versão 0 mas já têm as
+    # tabelas, por isso esta migração (e só esta) usa IF NOT EXISTS.
+    c.execute("""CREATE TABLE IF NOT EXISTS tabs
+                     (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT UNIQUE)""")
+    c.execute("""CREATE TABLE IF NOT EXISTS tasks
+                     (id INTEGER PRIMARY KEY AUTOINCREMENT, 
+                      tab_name TEXT, 
+                      title TEXT,
+                      task TEXT, 
+                      start_date TEXT, 
+                      end_date TEXT, 
+                      status TEXT,
+                      priority TEXT)""")
+    c.execute("""CREATE TABLE IF NOT EXISTS attachments
+                     (id INTEGER PRIMARY KEY AUTOINCREMENT, 
+                      task_id INTEGER, 
+                      file_path TEXT,
+                      FOREIGN KEY(task_id) REFERENCES tasks(id))""")
+    c.execute("""CREATE TABLE IF NOT EXISTS checklist_items
+                     (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                      task_id INTEGER,
+                      text TEXT,
+                      is_checked INTEGER,
+                      FOREIGN KEY(task_id) REFERENCES tasks(id))""")
+    c.execute("""CREATE TABLE IF NOT EXISTS settings
+                     (key TEXT PRIMARY KEY, value TEXT)""")
+
+def _migration_lookup_indexes(c):
+    c.execute("CREATE INDEX idx_tasks_tab_name ON tasks (tab_name)")
+    c.execute("CREATE INDEX idx_attachments_task_id ON attachments (task_id)")
+    c.execute("CREATE INDEX idx_checklist_items_task_id ON checklist_items (task_id)")
+
+def _migration_checklist_position(c):
+    c.execute("ALTER TABLE checklist_items ADD COLUMN position INTEGER NOT NULL DEFAULT 0")
+    # A ordem até aqui era a de inserção
+    c.execute("UPDATE checklist_items SET position = id")
+    c.execute("DROP INDEX IF EXISTS idx_checklist_items_task_id")
+    c.execute("CREATE INDEX idx_checklist_items_task_position ON checklist_items (task_id, position)")
+
+# Triggers de tasks -> task_search; recriados sempre que a tabela tasks é reconstruída.
+# Um comando por item: executescript faria COMMIT no meio da migração.
+_TASK_SEARCH_TRIGGERS = [
+    """CREATE TRIGGER task_search_ai AFTER INSERT ON tasks BEGIN
+           INSERT INTO task_search (rowid, title, task, checklist) VALUES (new.id, new.title, new.task, '');
+       END""",
+    """CREATE TRIGGER task_search_au AFTER UPDATE OF title, task ON tasks BEGIN
+           UPDATE task_search SET title = new.title, task = new.task WHERE rowid = new.id;
+       END""",
+    """CREATE TRIGGER task_search_ad AFTER DELETE ON tasks BEGIN
+           DELETE FROM task_search WHERE rowid = old.id;
+       END""",
+]
+
+def _migration_search_index(c):
+    # Índice FTS5 com rowid = tasks.id; triggers mantêm título, descrição e texto do checklist em dia
+    try:
+        c.execute("""CREATE VIRTUAL TABLE task_search USING fts5(
+                     title, task, checklist, tokenize = 'unicode61 remove_diacritics 2', prefix = '1 2 3')""")
+    except sqlite3.OperationalError as e:
+        print(f"Warning: full-text search disabled, SQLite has no FTS5 ({e})")
+        return
+    checklist_text = "(SELECT group_concat(text, ' ') FROM checklist_items WHERE task_id = {})"
+    for trigger in _TASK_SEARCH_TRIGGERS + [
+        f"""CREATE TRIGGER checklist_search_ai AFTER INSERT ON checklist_items BEGIN
+                UPDATE task_search SET checklist = {checklist_text.format("new.task_id")} WHERE rowid = new.task_id;
+            END""",
+        f"""CREATE TRIGGER checklist_search_au AFTER UPDATE OF text ON checklist_items BEGIN
+                UPDATE task_search SET checklist = {checklist_text.format("new.task_id")} WHERE rowid = new.task_id;
+            END""",
+        f"""CREATE TRIGGER checklist_search_ad AFTER DELETE ON checklist_items BEGIN
+                UPDATE task_search SET checklist = {checklist_text.format("old.task_id")} WHERE rowid = old.task_id;
+            END""",
+    ]:
+        c.execute(trigger)
+    c.execute(f"""INSERT INTO task_search (rowid, title, task, checklist)
+                  SELECT id, title, task, {checklist_text.format("tasks.id")} FROM tasks""")
+
+# Distância entre posições vizinhas; mover uma task usa o ponto médio e só grava aquela linha
+POSITION_GAP = 1024.0
+
+def _migration_task_position(c):
+    c.execute("ALTER TABLE tasks ADD COLUMN position REAL NOT NULL DEFAULT 0")
+    # Ordem inicial = a que load_tasks mostrava: prioridade, depois inserção
+    priority_order = {"Critical": 0, "Normal": 1, "Not Urgent": 2}
+    c.execute("SELECT id, tab_name, priority FROM tasks ORDER BY id")
+    # tab_name pode ser NULL em bancos antigos; None não se compara com str
+    ranked = sorted(c.fetchall(), key=lambda r: (r[1] or "", priority_order.get(r[2] or "Normal", 99), r[0]))
+    positions, counters = [], {}
+    for task_id, tab_name, _ in ranked:
+        counters[tab_name] = counters.get(tab_name, 0) + 1
+        positions.append((counters[tab_name] * POSITION_GAP, task_id))
+    c.executemany("UPDATE tasks SET position = ? WHERE id = ?", positions)
+    c.execute("DROP INDEX IF EXISTS idx_tasks_tab_name")
+    c.execute("CREATE INDEX idx_tasks_tab_position ON tasks (tab_name, position)")
+
+def _migration_tab_id(c):
+    # SQLite não troca a coluna no lugar: reconstrói tasks com tab_id = tabs.id.
+    # Tasks cujo tab_name não existe em tabs (já invisíveis) ficam com tab_id NULL.
+    # Sem REFERENCES: foreign_keys fica desligado no app e db.delete_tab apaga as tasks da aba.
+    c.execute("""CREATE TABLE tasks_new
+                     (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                      tab_id INTEGER,
+                      title TEXT,
+                      task TEXT,
+                      start_date TEXT,
+                      end_date TEXT,
+                      status TEXT,
+                      priority TEXT,
+                      position REAL NOT NULL DEFAULT 0)""")
+    c.execute("""INSERT INTO tasks_new (id, tab_id, title, task, start_date, end_date, status, priority, position)
+                 SELECT t.id, tb.id, t.title, t.task, t.start_date, t.end_date, t.status, t.priority, t.position
+                 FROM tasks t LEFT JOIN tabs tb ON tb.name = t.tab_name""")
+    # Ids apagados não podem voltar: a pasta de anexos usa o id da task
+    seq = c.execute("SELECT seq FROM sqlite_sequence WHERE name = 'tasks'").fetchone()
+    c.execute("DROP TABLE tasks")
+    c.execute("ALTER TABLE tasks_new RENAME TO tasks")
+    if seq:
+        c.execute("UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = 'tasks'", (seq[0],))
+    c.execute("CREATE INDEX idx_tasks_tab_position ON tasks (tab_id, position)")
+    if c.execute("SELECT 1 FROM sqlite_master WHERE name = 'task_search'").fetchone():
+        for trigger in _TASK_SEARCH_TRIGGERS:
+            c.execute(trigger)
+
+SCHEMA_MIGRATIONS = [
+    ("base schema", _migration_base_schema),
+    ("indexes on tasks.tab_name, attachments.task_id, checklist_items.task_id", _migration_lookup_indexes),
+    ("position column on checklist_items", _migration_checklist_position),
+    ("FTS5 search index over task titles, descriptions and checklists", _migration_search_index),
+    ("manual ordering position column on tasks", _migration_task_position),
+    ("tasks.tab_id foreign key instead of tasks.tab_name", _migration_tab_id),
+]
+
 # ---- simple DB shim (igual ao seu) ----
 class db:
+    TASK_COLUMNS = "id, title, task, start_date, end_date, status, priority, position"
+
+    _pool = None
+    _pool_lock = threading.Lock()
+    pragma_profile = dict(DB_PRAGMA_PROFILE)
+
+    # Valores que o PRAGMA devolve como número ao ser lido de volta
+    _PRAGMA_ENUMS = {
+        "synchronous": {"off": 0, "normal": 1, "full": 2, "extra": 3},
+        "temp_store": {"default": 0, "file": 1, "memory": 2},
+    }
+
+    @staticmethod
+    def connection():
+        """Context manager yielding a pooled connection (see `ConnectionPool.connection`)."""
+        if db._pool is None:
+            with db._pool_lock:
+                if db._pool is None:
+                    db._pool = ConnectionPool(DB_PATH, pragmas=db.pragma_profile)
+        return db._pool.connection()
+
+    @staticmethod
+    def close():
+        """Flushes pending writes and closes every pooled connection. The next call opens a fresh pool."""
+        db.writes.flush()
+        if len(db.writes):
+            print(f"Warning: {len(db.writes)} pending writes not saved, the database is still locked")
+        db.settings.invalidate()
+        with db._pool_lock:
+            pool, db._pool = db._pool, None
+        if pool:
+            pool.close()
+
     @staticmethod
-    def init_db():
+    def check_pragmas():
+        """Reads the active PRAGMA values back and compares them with `pragma_profile`.
+
+        Returns {name: (expected, active, ok)}. SQLite silently ignores some
+        settings (e.g. WAL on network drives, mmap on builds without it), so
+        this is the only way to know what is really in effect.
+        """
+        report = {}
+        with db.connection() as conn:
+            for name, expected in db.pragma_profile.items():
+                row = conn.execute(f"PRAGMA {name}").fetchone()
+                active = row[0] if row else None
+                wanted = db._PRAGMA_ENUMS.get(name, {}).get(str(expected).lower(), expected)
+                if isinstance(active, str):
+                    ok = active.lower() == str(wanted).lower()
+                else:
+                    ok = active == wanted
+                report[name] = (expected, active, ok)
+        return report
+
+    @staticmethod
+    def migrate(conn):
+        """Brings the schema up to `len(SCHEMA_MIGRATIONS)`, one transaction per step."""
+        latest = len(SCHEMA_MIGRATIONS)
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version > latest:
+            print(f"Warning: database schema v{version} is newer than this app (v{latest}); skipping migrations")
+            return
+        if conn.in_transaction:
+            conn.commit()
+        # Reconstruir tabelas (DROP + RENAME) com foreign_keys ligado apagaria/validaria filhos;
+        # o PRAGMA só muda fora de transação
+        foreign_keys = conn.execute("PRAGMA foreign_keys").fetchone()[0]
+        conn.execute("PRAGMA foreign_keys = OFF")
+        try:
+            db._apply_migrations(conn, version, latest)
+        finally:
+            conn.execute(f"PRAGMA foreign_keys = {foreign_keys}")
+
+    @staticmethod
+    def _apply_migrations(conn, version, latest):
+        for target in range(version + 1, latest + 1):
+            description, apply = SCHEMA_MIGRATIONS[target - 1]
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Outra instância pode ter migrado enquanto esperávamos o lock
+                if conn.execute("PRAGMA user_version").fetchone()[0] >= target:
+                    conn.rollback()
+                    continue
+                apply(conn.cursor())
+                conn.execute(f"PRAGMA user_version = {target}")
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            print(f"Database migrated to v{target}: {description}")
+
+    @staticmethod
+    def init_db(pragma_profile=None):
         os.makedirs(APP_DATA_DIR, exist_ok=True)
-        conn = sqlite3.connect(DB_PATH)
-        c = conn.cursor()
-        c.execute("""CREATE TABLE IF NOT EXISTS tabs
-                         (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT UNIQUE)""")
-        c.execute("""CREATE TABLE IF NOT EXISTS tasks
-                         (id INTEGER PRIMARY KEY AUTOINCREMENT, 
-                          tab_name TEXT, 
-                          title TEXT,
-                          task TEXT, 
-                          start_date TEXT, 
-                          end_date TEXT, 
-                          status TEXT,
-                          priority TEXT)""")
-        c.execute("""CREATE TABLE IF NOT EXISTS attachments
-                         (id INTEGER PRIMARY KEY AUTOINCREMENT, 
-                          task_id INTEGER, 
-                          file_path TEXT,
-                          FOREIGN KEY(task_id) REFERENCES tasks(id))""")
-        c.execute("""CREATE TABLE IF NOT EXISTS checklist_items
-                         (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                          task_id INTEGER,
-                          text TEXT,
-                          is_checked INTEGER,
-                          FOREIGN KEY(task_id) REFERENCES tasks(id))""")
-        c.execute("""CREATE TABLE IF NOT EXISTS settings
-                         (key TEXT PRIMARY KEY, value TEXT)""")
-        conn.commit()
-        conn.close()
+        if pragma_profile is not None:
+            # Um novo perfil só vale para conexões novas
+            db.close()
+            db.pragma_profile = {**DB_PRAGMA_PROFILE, **pragma_profile}
+        with db.connection() as conn:
+            db.migrate(conn)
         os.makedirs(ATTACHMENTS_DIR, exist_ok=True)
 
+        report = db.check_pragmas()
+        if DEBUG:
+            print("SQLite profile: " + ", ".join(f"{name}={active}" for name, (_, active, _) in report.items()))
+        for name, (expected, active, ok) in report.items():
+            if not ok:
+                print(f"Warning: PRAGMA {name} requested {expected!r} but SQLite is using {active!r}")
+
     @staticmethod
     def add_tab(name):
-        conn = sqlite3.connect(DB_PATH)
-        c = conn.cursor()
-        c.execute("INSERT OR IGNORE INTO tabs (name) VALUES (?)", (name,))
-        conn.commit()
-        conn.close()
+        with db.connection() as conn:
+            c = conn.cursor()
+            c.execute("INSERT OR IGNORE INTO tabs (name) VALUES (?)", (name,))
 
     @staticmethod
     def list_tabs():
-        conn = sqlite3.connect(DB_PATH)
-        c = conn.cursor()
-        c.execute("SELECT name FROM tabs")
-        tabs = [row[0] for row in c.fetchall()]
-        conn.close()
+        with db.connection() as conn:
+            c = conn.cursor()
+            c.execute("SELECT name FROM tabs")
+            tabs = [row[0] for row in c.fetchall()]
         return tabs
 
     @staticmethod
     def update_tab_name(old_name, new_name):
-        conn = sqlite3.connect(DB_PATH)
-        c = conn.cursor()
-        c.execute("UPDATE tabs SET name = ? WHERE name = ?", (new_name, old_name))
-        c.execute("UPDATE tasks SET tab_name = ? WHERE tab_name = ?", (new_name, old_name))
-        conn.commit()
-        conn.close()
+        db.writes.flush()
+        with db.connection() as conn:
+            c = conn.cursor()
+            # As tasks apontam para tabs.id: renomear é uma linha só
+            c.execute("UPDATE tabs SET name = ? WHERE name = ?", (new_name, old_name))
 
     @staticmethod
-    def add_task(tab_name, title, task, start_date, end_date, status, priority):
-        conn = sqlite3.connect(DB_PATH)
-        c = conn.cursor()
-        c.execute("INSERT INTO tasks (tab_name, title, task, start_date, end_date, status, priority) VALUES (?, ?, ?, ?, ?, ?, ?)",
-                  (tab_name, title, task, start_date, end_date, status, priority))
-        task_id = c.lastrowid
-        conn.commit()
-        conn.close()
+    def add_task(tab_name, title, task, start_date, end_date, status, priority, position=None):
+        """Inserts a task and returns its id. Without `position` it goes above the tab's first task."""
+        with db.connection() as conn:
+            c = conn.cursor()
+            if position is None:
+                c.execute("SELECT MIN(position) FROM tasks WHERE tab_id = (SELECT id FROM tabs WHERE name = ?)", (tab_name,))
+                first = c.fetchone()[0]
+                position = 0.0 if first is None else first - POSITION_GAP
+            c.execute("INSERT INTO tasks (tab_id, title, task, start_date, end_date, status, priority, position) VALUES ((SELECT id FROM tabs WHERE name = ?), ?, ?, ?, ?, ?, ?, ?)",
+                      (tab_name, title, task, start_date, end_date, status, priority, position))
+            task_id = c.lastrowid
         return task_id
 
+    @staticmethod
+    def set_task_position(task_id, position):
+        with db.connection() as conn:
+            conn.execute("UPDATE tasks SET position = ? WHERE id = ?", (position, task_id))
+
+    @staticmethod
+    def set_task_positions(positions):
+        """Rewrites many positions at once; `positions` is [(position, task_id), ...]."""
+        with db.connection() as conn:
+            conn.executemany("UPDATE tasks SET position = ? WHERE id = ?", positions)
+
     @staticmethod
     def list_tasks(tab_name):
-        conn = sqlite3.connect(DB_PATH)
-        c = conn.cursor()
-        c.execute("SELECT id, title, task, start_date, end_date, status, priority FROM tasks WHERE tab_name = ?", (tab_name,))
-        tasks = []
-        for row in c.fetchall():
-            tasks.append({
-                "id": row[0],
-                "title": row[1],
-                "task": row[2],
-                "start_date": row[3],
-                "end_date": row[4],
-                "status": row[5],
-                "priority": row[6]
-            })
-        conn.close()
+        db.writes.flush()
+        with db.connection() as conn:
+            c = conn.cursor()
+            c.execute(f"SELECT {db.TASK_COLUMNS} FROM tasks WHERE tab_id = (SELECT id FROM tabs WHERE name = ?) ORDER BY position, id", (tab_name,))
+            tasks = [db._task_from_row(row) for row in c.fetchall()]
         return tasks
 
     @staticmethod
-    def update_task(task_id, title, task, start_date, end_date, status, priority, tab_name):
-        conn = sqlite3.connect(DB_PATH)
-        c = conn.cursor()
-        c.execute("UPDATE tasks SET title = ?, task = ?, start_date = ?, end_date = ?, status = ?, priority = ?, tab_name = ? WHERE id = ?",
-                  (title, task, start_date, end_date, status, priority, tab_name, task_id))
-        conn.commit()
-        conn.close()
+    def _task_from_row(row):
+        return {
+            "id": row[0],
+            "title": row[1],
+            "task": row[2],
+            "start_date": row[3],
+            "end_date": row[4],
+            "status": row[5],
+            "priority": row[6],
+            "position": row[7]
+        }
 
     @staticmethod
-    def delete_task(task_id):
-        task_attachment_dir = os.path.join(ATTACHMENTS_DIR, str(task_id))
-        if os.path.exists(task_attachment_dir):
-            shutil.rmtree(task_attachment_dir)
+    def load_all_tasks(tab_name=None):
+        """Loads every task grouped by tab, with checklist items and attachments attached.
+
+        Uses three queries in one read transaction no matter how many tasks or
+        tabs exist, instead of one checklist and one attachment query per task.
+        Returns {tab_name: [task, ...]} where each task dict also carries
+        "checklist" and "attachments" lists in the shape of
+        `list_checklist_items` / `list_attachments`.
+        """
+        db.writes.flush()
+        tasks_by_tab = {}
+        tasks_by_id = {}
+        with db.connection() as conn:
+            c = conn.cursor()
+            if not conn.in_transaction:
+                conn.execute("BEGIN")  # mesmo snapshot para as três consultas
+            columns = ", ".join(f"t.{column}" for column in db.TASK_COLUMNS.split(", "))
+            if tab_name is None:
+                c.execute(f"SELECT {columns}, tb.name FROM tasks t JOIN tabs tb ON tb.id = t.tab_id ORDER BY t.tab_id, t.position, t.id")
+                task_filter, params = "", ()
+            else:
+                c.execute(f"SELECT {columns}, tb.name FROM tasks t JOIN tabs tb ON tb.id = t.tab_id WHERE tb.name = ? ORDER BY t.position, t.id", (tab_name,))
+                task_filter, params = "WHERE task_id IN (SELECT id FROM tasks WHERE tab_id = (SELECT id FROM tabs WHERE name = ?))", (tab_name,)
+            for row in c.fetchall():
+                task = db._task_from_row(row)
+                task["checklist"] = []
+                task["attachments"] = []
+                tasks_by_tab.setdefault(row[-1], []).append(task)
+                tasks_by_id[task["id"]] = task
+
+            c.execute(f"SELECT id, task_id, text, is_checked FROM checklist_items {task_filter} ORDER BY task_id, position, id", params)
+            for item_id, task_id, text, is_checked in c.fetchall():
+                if task_id in tasks_by_id:
+                    tasks_by_id[task_id]["checklist"].append({"id": item_id, "text": text, "is_checked": bool(is_checked)})
+
+            c.execute(f"SELECT id, task_id, file_path FROM attachments {task_filter} ORDER BY id", params)
+            for att_id, task_id, file_path in c.fetchall():
+                if task_id in tasks_by_id:
+                    tasks_by_id[task_id]["attachments"].append({"id": att_id, "file_path": file_path})
+        return tasks_by_tab
 
-        conn = sqlite3.connect(DB_PATH)
-        c = conn.cursor()
-        c.execute("DELETE FROM attachments WHERE task_id = ?", (task_id,))
-        c.execute("DELETE FROM checklist_items WHERE task_id = ?", (task_id,))
-        c.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
-        conn.commit()
-        conn.close()
+    @staticmethod
+    def update_task(task_id, title, task, start_date, end_date, status, priority):
+        # A aba da task não muda ao editar; tab_id só é escrito em add_task
+        with db.connection() as conn:
+            c = conn.cursor()
+            c.execute("UPDATE tasks SET title = ?, task = ?, start_date = ?, end_date = ?, status = ?, priority = ? WHERE id = ?",
+                      (title, task, start_date, end_date, status, priority, task_id))
+
+    @staticmethod
+    def delete_task(task_id):
+        db.writes.flush()
+        with db.connection() as conn:
+            db._delete_tasks(conn, "id = ?", (task_id,))
+        db.attachment_cleaner.remove([task_id])
 
     @staticmethod
     def delete_tab(tab_name):
-        conn = sqlite3.connect(DB_PATH)
+        """Deletes a tab and everything in it in one transaction; attachment folders go in the background."""
+        db.writes.flush()
+        with db.connection() as conn:
+            tab = conn.execute("SELECT id FROM tabs WHERE name = ?", (tab_name,)).fetchone()
+            if not tab:
+                return
+            task_ids = db._delete_tasks(conn, "tab_id = ?", (tab[0],))
+            conn.execute("DELETE FROM tabs WHERE id = ?", (tab[0],))
+        db.attachment_cleaner.remove(task_ids)
+
+    @staticmethod
+    def _delete_tasks(conn, where, params):
+        """Set-based delete of the tasks matching `where` plus their checklist items and attachments rows.
+
+        Tasks go first so the FTS triggers drop whole documents instead of
+        re-indexing the checklist after every deleted item. Returns the ids.
+        """
         c = conn.cursor()
-        c.execute("SELECT id FROM tasks WHERE tab_name = ?", (tab_name,))
-        task_ids = [row[0] for row in c.fetchall()]
-        for task_id in task_ids:
-            db.delete_task(task_id)
-        c.execute("DELETE FROM tabs WHERE name = ?", (tab_name,))
-        conn.commit()
-        conn.close()
+        c.execute("CREATE TEMP TABLE IF NOT EXISTS doomed_tasks (id INTEGER PRIMARY KEY)")
+        c.execute("DELETE FROM doomed_tasks")
+        c.execute(f"INSERT INTO doomed_tasks SELECT id FROM tasks WHERE {where}", params)
+        task_ids = [row[0] for row in c.execute("SELECT id FROM doomed_tasks")]
+        c.execute("DELETE FROM tasks WHERE id IN (SELECT id FROM doomed_tasks)")
+        c.execute("DELETE FROM checklist_items WHERE task_id IN (SELECT id FROM doomed_tasks)")
+        c.execute("DELETE FROM attachments WHERE task_id IN (SELECT id FROM doomed_tasks)")
+        c.execute("DELETE FROM doomed_tasks")
+        return task_ids
+
+    @staticmethod
+    def existing_task_ids(task_ids):
+        """The subset of `task_ids` that still has a row in tasks."""
+        task_ids = list(task_ids)
+        existing = []
+        with db.connection() as conn:
+            for start in range(0, len(task_ids), 500):
+                chunk = task_ids[start:start + 500]
+                existing += [row[0] for row in conn.execute(
+                    f"SELECT id FROM tasks WHERE id IN ({', '.join('?' * len(chunk))})", chunk)]
+        return existing
+
+    @staticmethod
+    def _search_expression(text):
+        """Turns free text into an FTS5 query: every word must match, as a prefix."""
+        words = [w.replace('"', '""') for w in text.split()]
+        return " ".join(f'"{w}"*' for w in words if w)
+
+    # Buscas muito amplas só ranqueiam as N tasks mais recentes que casam; bm25 sobre 100k linhas custa ~150 ms
+    SEARCH_RANK_WINDOW = 2000
+
+    @staticmethod
+    def search_tasks(text, limit=50):
+        """Full-text search over every tab, best matches first (title > description > checklist).
+
+        Only the newest `SEARCH_RANK_WINDOW` matches are ranked. Returns dicts
+        with id, tab_name, title, status and a highlighted snippet.
+        """
+        expression = db._search_expression(text)
+        if not expression:
+            return []
+        db.writes.flush()
+        with db.connection() as conn:
+            c = conn.cursor()
+            try:
+                c.execute("""SELECT t.id, tb.name, t.title, t.status,
+                                    snippet(task_search, -1, '[', ']', '…', 8)
+                             FROM task_search JOIN tasks t ON t.id = task_search.rowid JOIN tabs tb ON tb.id = t.tab_id
+                             WHERE task_search MATCH :expr AND task_search.rowid >= (
+                                 SELECT COALESCE(MIN(rowid), 0) FROM (
+                                     SELECT rowid FROM task_search WHERE task_search MATCH :expr
+                                     ORDER BY rowid DESC LIMIT :window))
+                             ORDER BY bm25(task_search, 10.0, 3.0, 1.0) LIMIT :limit""",
+                          {"expr": expression, "window": db.SEARCH_RANK_WINDOW, "limit": limit})
+            except sqlite3.OperationalError:
+                # Sem FTS5 (ver _migration_search_index): busca simples por substring
+                like = f"%{text.strip()}%"
+                c.execute("""SELECT t.id, tb.name, t.title, t.status, substr(t.task, 1, 60) FROM tasks t JOIN tabs tb ON tb.id = t.tab_id
+                             WHERE t.title LIKE ? OR t.task LIKE ? ORDER BY t.id DESC LIMIT ?""", (like, like, limit))
+            results = [{"id": row[0], "tab_name": row[1], "title": row[2], "status": row[3], "snippet": row[4]} for row in c.fetchall()]
+        return results
 
     @staticmethod
     def add_attachment(task_id, file_path):
-        conn = sqlite3.connect(DB_PATH)
-        c = conn.cursor()
-        c.execute("INSERT INTO attachments (task_id, file_path) VALUES (?, ?)", (task_id, file_path))
-        conn.commit()
-        conn.close()
+        with db.connection() as conn:
+            c = conn.cursor()
+            c.execute("INSERT INTO attachments (task_id, file_path) VALUES (?, ?)", (task_id, file_path))
 
     @staticmethod
     def list_attachments(task_id):
-        conn = sqlite3.connect(DB_PATH)
-        c = conn.cursor()
-        c.execute("SELECT id, file_path FROM attachments WHERE task_id = ?", (task_id,))
-        attachments = [{"id": row[0], "file_path": row[1]} for row in c.fetchall()]
-        conn.close()
+        db.writes.flush()
+        with db.connection() as conn:
+            c = conn.cursor()
+            c.execute("SELECT id, file_path FROM attachments WHERE task_id = ?", (task_id,))
+            attachments = [{"id": row[0], "file_path": row[1]} for row in c.fetchall()]
         return attachments
 
     @staticmethod
     def get_attachment(attachment_id):
-        conn = sqlite3.connect(DB_PATH)
-        c = conn.cursor()
-        c.execute("SELECT file_path FROM attachments WHERE id = ?", (attachment_id,))
-        result = c.fetchone()
-        conn.close()
+        with db.connection() as conn:
+            c = conn.cursor()
+            c.execute("SELECT file_path FROM attachments WHERE id = ?", (attachment_id,))
+            result = c.fetchone()
         return result[0] if result else None
 
     @staticmethod
@@ -402,74 +1361,370 @@ class db:
         file_path = db.get_attachment(attachment_id)
         if file_path and os.path.exists(file_path):
             os.remove(file_path)
-        conn = sqlite3.connect(DB_PATH)
-        c = conn.cursor()
-        c.execute("DELETE FROM attachments WHERE id = ?", (attachment_id,))
-        conn.commit()
-        conn.close()
+        with db.connection() as conn:
+            c = conn.cursor()
+            c.execute("DELETE FROM attachments WHERE id = ?", (attachment_id,))
 
     @staticmethod
     def list_checklist_items(task_id):
-        conn = sqlite3.connect(DB_PATH)
-        c = conn.cursor()
-        c.execute("SELECT id, text, is_checked FROM checklist_items WHERE task_id = ?", (task_id,))
-        items = [{"id": row[0], "text": row[1], "is_checked": bool(row[2])} for row in c.fetchall()]
-        conn.close()
+        db.writes.flush()
+        with db.connection() as conn:
+            c = conn.cursor()
+            c.execute("SELECT id, text, is_checked FROM checklist_items WHERE task_id = ? ORDER BY position, id", (task_id,))
+            items = [{"id": row[0], "text": row[1], "is_checked": bool(row[2])} for row in c.fetchall()]
         return items
 
     @staticmethod
     def add_checklist_item(task_id, text, is_checked):
-        conn = sqlite3.connect(DB_PATH)
-        c = conn.cursor()
-        c.execute("INSERT INTO checklist_items (task_id, text, is_checked) VALUES (?, ?, ?)", (task_id, text, int(is_checked)))
-        item_id = c.lastrowid
-        conn.commit()
-        conn.close()
+        """Appends an item after the task's last one and returns its id."""
+        with db.connection() as conn:
+            c = conn.cursor()
+            c.execute("""INSERT INTO checklist_items (task_id, text, is_checked, position)
+                         SELECT ?, ?, ?, COALESCE(MAX(position), -1) + 1 FROM checklist_items WHERE task_id = ?""",
+                      (task_id, text, int(is_checked), task_id))
+            item_id = c.lastrowid
         return item_id
 
     @staticmethod
     def update_checklist_item(item_id, text, is_checked):
-        conn = sqlite3.connect(DB_PATH)
-        c = conn.cursor()
-        c.execute("UPDATE checklist_items SET text = ?, is_checked = ? WHERE id = ?", (text, int(is_checked), item_id))
-        conn.commit()
-        conn.close()
+        with db.connection() as conn:
+            c = conn.cursor()
+            c.execute("UPDATE checklist_items SET text = ?, is_checked = ? WHERE id = ?", (text, int(is_checked), item_id))
 
     @staticmethod
     def delete_checklist_item(item_id):
-        conn = sqlite3.connect(DB_PATH)
-        c = conn.cursor()
-        c.execute("DELETE FROM checklist_items WHERE id = ?", (item_id,))
-        conn.commit()
-        conn.close()
+        with db.connection() as conn:
+            c = conn.cursor()
+            c.execute("DELETE FROM checklist_items WHERE id = ?", (item_id,))
 
     @staticmethod
     def get_setting(key, default=None):
-        conn = sqlite3.connect(DB_PATH)
-        c = conn.cursor()
-        c.execute("SELECT value FROM settings WHERE key = ?", (key,))
-        result = c.fetchone()
-        conn.close()
-        if result:
-            return result[0]
-        return default
+        return db.settings.get(key, default)
 
     @staticmethod
     def set_setting(key, value):
-        conn = sqlite3.connect(DB_PATH)
-        c = conn.cursor()
-        c.execute("INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)", (key, str(value)))
-        conn.commit()
-        conn.close()
+        db.settings.set(key, value)
+
+# Cada chamada pública do db entra nas métricas como "db.<nome>". Ficam de fora connection (só o pool)
+# e get_setting, que lê do cache em memória e custaria mais medido do que executado
+for _name, _attr in list(vars(db).items()):
+    if isinstance(_attr, staticmethod) and not _name.startswith("_") and _name not in ("connection", "get_setting"):
+        setattr(db, _name, staticmethod(metrics.wrap(f"db.{_name}", _attr.__func__)))
+del _name, _attr
+
+# Fila de escrita compartilhada: auto-save e checklists gravam por aqui sem bloquear a UI
+db.writes = WriteBehindQueue(db.connection)
+# Configurações ficam em memória; leituras não vão mais ao SQLite
+db.settings = SettingsCache(db.connection)
+# Pastas de anexos de tasks apagadas são removidas fora da transação e da thread da UI
+db.attachment_cleaner = AttachmentCleaner(db.existing_task_ids)
+
+# ---- Modelo de dados das tasks ----
+class Task:
+    """Plain in-memory record of one task.
+
+    A TaskRow is only a view bound to one of these; statistics, the chart and
+    the due-date checks read `Task` objects instead of walking Flet controls.
+    """
+    __slots__ = ("id", "title", "task", "start_date", "end_date", "status", "priority",
+                 "position", "checklist", "attachments", "notification_status", "days_diff", "store")
+
+    FIELDS = ("title", "task", "start_date", "end_date", "status", "priority")
+
+    def __init__(self, id=None, title="", task="", start_date="", end_date="", status="Ongoing", priority="Normal", checklist=None, attachments=None, position=0.0):
+        self.id = id
+        self.title = title or ""
+        self.task = task or ""
+        self.start_date = start_date or ""
+        self.end_date = end_date or ""
+        self.status = status or "Ongoing"
+        self.priority = priority or "Normal"
+        self.position = position or 0.0
+        # Só usados para construir a TaskRow; descartados depois disso
+        self.checklist = checklist
+        self.attachments = attachments
+        self.notification_status = None
+        self.days_diff = None
+        self.store = None  # TaskStore dono desta task; mantém os contadores em dia
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data.get("id"), data.get("title"), data.get("task"), data.get("start_date"), data.get("end_date"),
+                   data.get("status"), data.get("priority"), data.get("checklist"), data.get("attachments"), data.get("position"))
+
+    def update(self, data):
+        """Copies the editable fields from a `TaskRow.get_data()`-shaped dict."""
+        store = self.store
+        # Tira e recoloca a task nos contadores de uma vez só: saves rodam fora da thread da UI
+        with store._lock if store else nullcontext():
+            if store: store._count(self, -1)
+            for field in Task.FIELDS:
+                if field in data:
+                    setattr(self, field, data[field])
+            if store: store._count(self, 1)
+
+    def to_dict(self):
+        return {field: getattr(self, field) for field in Task.FIELDS}
+
+    @property
+    def is_ongoing(self):
+        return self.status == "Ongoing"
+
+    @property
+    def start(self):
+        return parse_task_date(self.start_date)
+
+    @property
+    def end(self):
+        return parse_task_date(self.end_date)
+
+    def compute_due_status(self, today):
+        """Updates notification_status/days_diff relative to `today` (a midnight datetime).
+
+        Returns True when the status or the day count changed.
+        """
+        status, days_diff = None, None
+        end = self.end
+        if self.is_ongoing and end:
+            days_diff = (end - today).days
+            status = "overdue" if days_diff < 0 else "upcoming" if days_diff <= 3 else None
+        changed = (status, days_diff) != (self.notification_status, self.days_diff)
+        self.notification_status, self.days_diff = status, days_diff
+        return changed
+
+
+class TaskStore:
+    """Every `Task` of one tab, rendered or not, plus the aggregations the UI needs.
+
+    The ongoing/overdue counters and the chart histogram are adjusted on every
+    add, remove and `Task.update`, so `counts()` is O(1) and `monthly_counts()`
+    does not depend on the number of tasks; overdue is only recounted when the
+    day rolls over. Saves, the due-date scheduler and the UI can reach the
+    same store from different threads, so every change and read of the
+    counters holds `_lock`.
+    """
+
+    def __init__(self, tasks=()):
+        self._lock = threading.RLock()
+        self.tasks = {}  # dict como conjunto ordenado: remoção em O(1)
+        self.ongoing = 0
+        self.overdue = 0
+        self.today = self._midnight()
+        # (série, ano, mês) -> tasks; "due_day" usa (série, ano, mês, dia) para o mês corrente do overdue
+        self.histogram = Counter()
+        self.years = Counter()
+        for task in tasks:
+            self.add(task)
+
+    @staticmethod
+    def _midnight():
+        return datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+
+    def __iter__(self):
+        # Cópia: outra thread pode adicionar/remover tasks durante a iteração
+        with self._lock:
+            return iter(list(self.tasks))
+
+    def __len__(self):
+        return len(self.tasks)
+
+    def add(self, task):
+        with self._lock:
+            task.store = self
+            self.tasks[task] = None
+            self._count(task, 1)
+
+    def remove(self, task):
+        with self._lock:
+            if self.tasks.pop(task, False) is not None:
+                return
+            self._count(task, -1)
+            task.store = None
+        due_dates.untrack([task])
+
+    def _is_overdue(self, task, today):
+        end = task.end
+        return task.is_ongoing and end is not None and end < today
+
+    def _count(self, task, sign):
+        ongoing = task.is_ongoing
+        if ongoing:
+            self.ongoing += sign
+            if self._is_overdue(task, self.today):
+                self.overdue += sign
+
+        start, end = task.start, task.end
+        keys = []
+        if start:
+            keys.append(("total", start.year, start.month))
+            if ongoing:
+                keys.append(("ongoing", start.year, start.month))
+        if end:
+            if ongoing:
+                keys += [("due", end.year, end.month), ("due_day", end.year, end.month, end.day)]
+            else:
+                keys.append(("completed", end.year, end.month))
+        for key in keys:
+            self.histogram[key] += sign
+        for year in {d.year for d in (start, end) if d}:
+            self.years[year] += sign
+            if not self.years[year]:
+                del self.years[year]
+
+    def monthly_counts(self, series, year, today=None):
+        """Tasks per month (list of 12) for a chart series: total, ongoing, completed or overdue.
+
+        total/ongoing bucket by start date, completed/overdue by end date.
+        """
+        histogram = self.histogram
+        today = today or self._midnight()
+        counts = []
+        with self._lock:
+            if series != "overdue":
+                return [histogram[(series, year, month)] for month in range(1, 13)]
+            for month in range(1, 13):
+                if (year, month) < (today.year, today.month):
+                    counts.append(histogram[("due", year, month)])
+                elif (year, month) == (today.year, today.month):
+                    counts.append(sum(histogram[("due_day", year, month, day)] for day in range(1, today.day)))
+                else:
+                    counts.append(0)
+        return counts
+
+    def recount(self, today=None):
+        """Full O(n) recount; returns (total, ongoing, completed, overdue) without touching the counters."""
+        with self._lock:
+            today = today or self.today
+            ongoing = sum(1 for task in self.tasks if task.is_ongoing)
+            overdue = sum(1 for task in self.tasks if self._is_overdue(task, today))
+            return len(self.tasks), ongoing, len(self.tasks) - ongoing, overdue
+
+    def counts(self, today=None):
+        """Returns (total, ongoing, completed, overdue)."""
+        today = today or self._midnight()
+        with self._lock:
+            if today != self.today:
+                self.today = today
+                self.overdue = self.recount(today)[3]
+            result = (len(self.tasks), self.ongoing, len(self.tasks) - self.ongoing, self.overdue)
+            if DEBUG:
+                expected = self.recount(today)
+                if result != expected:
+                    print(f"TaskStore counters out of sync: {result} != {expected}")
+                    _, self.ongoing, _, self.overdue = expected
+                    result = expected
+        return result
+
+class DueDateScheduler:
+    """Min-heap of the next midnight at which each tracked task's due badge changes.
+
+    A task more than UPCOMING_DAYS from its end date changes when it becomes
+    "upcoming"; an upcoming or overdue one changes every midnight (its day
+    count). When a deadline comes, only the tasks it covers are handed to
+    `listeners` (on the shared `scheduler` thread) and rescheduled. Entries of
+    edited, completed or deleted tasks are marked stale and skipped.
+    """
+
+    UPCOMING_DAYS = 3
+    # Reconfere o relógio a cada 10 min: o relógio monotônico pode parar com a máquina suspensa
+    MAX_SLEEP = 600
+
+    def __init__(self):
+        self._heap = []
+        self._entries = {}  # task -> [deadline, seq, task]; task None = entrada cancelada
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        self.listeners = []
+
+    def __len__(self):
+        return len(self._entries)
+
+    @classmethod
+    def next_transition(cls, task, today):
+        """The midnight after `today` at which `task`'s badge changes, or None if it never will."""
+        end = task.end
+        if not task.is_ongoing or end is None:
+            return None
+        becomes_upcoming = end - timedelta(days=cls.UPCOMING_DAYS)
+        return becomes_upcoming if becomes_upcoming > today else today + timedelta(days=1)
+
+    def track(self, tasks, today=None):
+        """(Re)schedules `tasks` from their current data; call after their due status was computed for `today`."""
+        today = today or TaskStore._midnight()
+        with self._lock:
+            for task in tasks:
+                self._cancel(task)
+                deadline = self.next_transition(task, today)
+                if deadline is not None:
+                    entry = [deadline, next(self._counter), task]
+                    self._entries[task] = entry
+                    heapq.heappush(self._heap, entry)
+            # Muitas entradas canceladas: reconstrói o heap só com as válidas
+            if len(self._heap) > 2 * len(self._entries) + 64:
+                self._heap = list(self._entries.values())
+                heapq.heapify(self._heap)
+            self._arm()
+
+    def untrack(self, tasks):
+        with self._lock:
+            for task in tasks:
+                self._cancel(task)
+
+    def _cancel(self, task):
+        entry = self._entries.pop(task, None)
+        if entry:
+            entry[2] = None
+
+    def pop_due(self, now=None):
+        """Removes and returns the tasks whose transition is at or before `now`, rescheduled past it."""
+        now = now or datetime.now()
+        due = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                task = heapq.heappop(self._heap)[2]
+                if task is not None:
+                    del self._entries[task]
+                    due.append(task)
+        self.track([task for task in due if task.store is not None], now.replace(hour=0, minute=0, second=0, microsecond=0))
+        return due
+
+    def _arm(self):
+        key = ("due_dates", id(self))
+        while self._heap and self._heap[0][2] is None:
+            heapq.heappop(self._heap)
+        if not self._heap:
+            scheduler.cancel(key)
+            return
+        delay = (self._heap[0][0] - datetime.now()).total_seconds()
+        scheduler.call_later(min(max(delay, 0), self.MAX_SLEEP), self._fire, key=key)
+
+    def _fire(self):
+        due = self.pop_due()  # também rearma o timer para a próxima transição
+        if not due:
+            return
+        for listener in list(self.listeners):
+            try:
+                listener(due)
+            except Exception as e:
+                print(f"Error in due date listener: {e}")
+
+
+# Próximas mudanças de "upcoming"/"overdue" de todas as tasks carregadas
+due_dates = DueDateScheduler()
 
 # ---- TaskRow - com drag and drop para arquivos e minimização ----
 class TaskRow(ft.Container):
-    months = {
-        1: "Jan", 2: "Feb", 3: "Mar", 4: "Apr", 5: "May", 6: "Jun",
-        7: "Jul", 8: "Aug", 9: "Sep", 10: "Oct", 11: "Nov", 12: "Dec"
-    }
-
-    def __init__(self, on_save, on_delete, on_duplicate, on_move_up, on_move_down, title=None, task=None, start_date=None, end_date=None, status=None, priority=None, db_id=None, get_auto_save_setting=None, scale=None, base_font_size=12):
+    months = MONTHS
+
+    def __init__(self, on_save, on_delete, on_duplicate, on_move_up, on_move_down, title=None, task=None, start_date=None, end_date=None, status=None, priority=None, db_id=None, get_auto_save_setting=None, scale=None, base_font_size=12, checklist_items=None, attachments=None, model=None):
+        # A TaskRow é só a visão de um Task; sem modelo, cria um com os valores recebidos
+        if model is None:
+            model = Task(db_id, title, task, start_date, end_date, status, priority, checklist_items, attachments)
+        self.model = model
+        title, task, start_date, end_date = model.title, model.task, model.start_date, model.end_date
+        status, priority, db_id = model.status, model.priority, model.id
+        checklist_items, attachments = model.checklist, model.attachments
+        model.checklist = model.attachments = None
         self.base_font_size = base_font_size
         self.on_save = on_save
         self.on_delete = on_delete
@@ -484,9 +1739,10 @@ class TaskRow(ft.Container):
         self.has_date_error = False
         self.attachments_changed = False
         self.checklist_changed = False
+        self._dirty_checklist_rows = set()  # itens já gravados que mudaram desde o último save
         self.notification_status = None
+        self._notification_shown = (None, None, None)  # (status, days_diff, tema claro) já desenhado
         self.get_auto_save_setting = get_auto_save_setting
-        self.auto_save_timer = None
         self.scale_func = scale if scale else lambda x: x # Fallback for safety
 
         self.original_data = {
@@ -800,9 +2056,10 @@ class TaskRow(ft.Container):
             animate_opacity=ft.Animation(duration=400, curve="ease_in")
         )
 
+        # checklist_items/attachments vêm pré-carregados por db.load_all_tasks
         if self.db_id:
-            self._load_attachments()
-        self._load_checklist()
+            self._load_attachments(attachments)
+        self._load_checklist(checklist_items)
         self._on_status_change()
         self._validate_dates()
         self._update_minimized_info()
@@ -833,6 +2090,8 @@ class TaskRow(ft.Container):
             self.main_container.bgcolor = self.original_bgcolor
         
         self._update_minimized_info()
+        # Refaz as cores do badge de vencimento com a paleta do novo tema (só se o tema mudou de claro/escuro)
+        self.set_notification_status(self.notification_status, self._notification_shown[1], update=False)
         
         try: self.update() 
         except: pass
@@ -922,24 +2181,24 @@ class TaskRow(ft.Container):
             # If we animated and opened the task, disable size animation afterwards
             # so that content changes (typing, adding items) don't animate.
             if animated and not self.is_minimized:
-                def remove_animation_after_delay():
-                    time.sleep(0.3) # A bit longer than the animation duration
+                def remove_animation():
                     self.expandable_content.animate_size = None
                     try: self.update()
                     except: pass
-                threading.Thread(target=remove_animation_after_delay, daemon=True).start()
+                # A bit longer than the animation duration
+                scheduler.call_later(0.3, remove_animation, key=("remove_size_animation", id(self)))
 
     def _create_checklist_item_row(self, item_id=None, text="", is_checked=False):
         item_row = ft.Row(
             data=item_id, # Store the DB id here
             controls=[
-                ft.Checkbox(value=is_checked, on_change=self._on_checklist_change),
+                ft.Checkbox(value=is_checked, on_change=lambda e: self._on_checklist_change(e, item_row)),
                 ft.TextField(
                     value=text,
                     expand=True,
                     border=ft.InputBorder.UNDERLINE,
                     text_style=ft.TextStyle(size=self.scale_func(self.base_font_size)),
-                    on_change=self._on_checklist_change
+                    on_change=lambda e: self._on_checklist_change(e, item_row)
                 ),
                 ft.IconButton(
                     icon=ft.Icons.REMOVE,
@@ -950,7 +2209,9 @@ class TaskRow(ft.Container):
         )
         return item_row
 
-    def _on_checklist_change(self, e=None):
+    def _on_checklist_change(self, e=None, item_row=None):
+        if item_row is not None and item_row.data:
+            self._dirty_checklist_rows.add(item_row)
         self.checklist_changed = True
         self._on_field_change()
 
@@ -960,7 +2221,8 @@ class TaskRow(ft.Container):
         if item_row in self.checklist_col.controls:
             item_id = item_row.data
             if item_id:
-                db.delete_checklist_item(item_id)
+                db.writes.submit(("checklist_item", item_id), db.delete_checklist_item, item_id)
+            self._dirty_checklist_rows.discard(item_row)
             self.checklist_col.controls.remove(item_row)
             self._on_checklist_change()
             try: self.update()
@@ -979,10 +2241,12 @@ class TaskRow(ft.Container):
         try: self.update()
         except: pass
 
-    def _load_checklist(self):
+    def _load_checklist(self, items=None):
         self.checklist_col.controls.clear()
+        self._dirty_checklist_rows.clear()
         if not self.db_id: return
-        items = db.list_checklist_items(self.db_id)
+        if items is None:
+            items = db.list_checklist_items(self.db_id)
         for item in items:
             item_row = self._create_checklist_item_row(item['id'], item['text'], item['is_checked'])
             self.checklist_col.controls.append(item_row)
@@ -991,10 +2255,16 @@ class TaskRow(ft.Container):
 
     def _save_checklist(self):
         if not self.checklist_changed or not self.db_id: return
-        for item_row in self.checklist_col.controls:
+        # Só os itens alterados vão para a fila; itens novos precisam do id na hora e são inseridos juntos
+        for item_row in self._dirty_checklist_rows:
             item_id, is_checked, text = item_row.data, item_row.controls[0].value, item_row.controls[1].value
-            if item_id: db.update_checklist_item(item_id, text, is_checked)
-            else: item_row.data = db.add_checklist_item(self.db_id, text, is_checked)
+            db.writes.submit(("checklist_item", item_id), db.update_checklist_item, item_id, text, is_checked)
+        self._dirty_checklist_rows.clear()
+        new_rows = [item_row for item_row in self.checklist_col.controls if not item_row.data]
+        if new_rows:
+            with db.connection():
+                for item_row in new_rows:
+                    item_row.data = db.add_checklist_item(self.db_id, item_row.controls[1].value, item_row.controls[0].value)
         self.checklist_changed = False
 
     def set_reorder_mode(self, active: bool):
@@ -1077,6 +2347,7 @@ class TaskRow(ft.Container):
             # Simular adição de arquivo
             if self.db_id:
                 # Em uma implementação real, você processaria os arquivos aqui
+                import random
                 fake_file_name = f"dropped_file_{random.randint(1000, 9999)}.txt"
                 task_attachment_dir = os.path.join(ATTACHMENTS_DIR, str(self.db_id))
                 if not os.path.exists(task_attachment_dir):
@@ -1175,18 +2446,7 @@ class TaskRow(ft.Container):
 
     @staticmethod
     def _parse_date(date_str):
-        if not date_str:
-            return None
-        try:
-            parts = date_str.split('/')
-            if len(parts) != 3: return None
-            day = int(parts[0]); month_name = parts[1]; year = int(parts[2])
-            month_names = {v: k for k, v in TaskRow.months.items()}
-            month = month_names.get(month_name)
-            if not month: return None
-            return datetime(year, month, day)
-        except Exception:
-            return None
+        return parse_task_date(date_str)
 
     def _validate_dates(self):
         start_date = TaskRow._parse_date(self.start_date_field.value)
@@ -1217,17 +2477,28 @@ class TaskRow(ft.Container):
         try: self.update()
         except: pass
 
+    def _sync_model(self):
+        self.model.update(self.get_data())
+        self.model.id = self.db_id
+
     def _on_field_change(self, e=None):
-        if self.auto_save_timer:
-            self.auto_save_timer.cancel()
+        scheduler.cancel(("auto_save", id(self)))
+        self._sync_model()
 
         if self._validate_dates() and self._has_data_changed():
             self._show_change_indicator()
         self._update_minimized_info()
         
         if self.get_auto_save_setting and self.get_auto_save_setting() and self._has_data_changed() and not self.has_date_error:
-            self.auto_save_timer = threading.Timer(1.5, self.save)
-            self.auto_save_timer.start()
+            scheduler.call_later(1.5, self._start_auto_save, key=("auto_save", id(self)))
+
+    def _start_auto_save(self):
+        # Roda na thread do scheduler: só repassa o save (banco + UI) para o executor de eventos do Flet
+        page = self.page
+        if page is not None and hasattr(page, "run_thread"):
+            page.run_thread(self.save)
+        else:
+            threading.Thread(target=self.save, daemon=True).start()
 
     def _on_status_dropdown_change(self, e=None):
         if self.status_field.value == "Complete":
@@ -1255,7 +2526,7 @@ class TaskRow(ft.Container):
         self._on_status_change()
         self._on_field_change()
         if hasattr(self.page, 'app_instance'):
-            self.page.app_instance.check_all_due_dates()
+            self.page.app_instance.refresh_task_due_date(self)
 
     def _has_data_changed(self):
         current_data = self.get_data()
@@ -1282,19 +2553,19 @@ class TaskRow(ft.Container):
         self.change_indicator.visible = False
         try: self.update()
         except: pass
-        def hide_after():
-            time.sleep(2)
-            try:
-                self.save_indicator.visible = False
-                self.update()
-            except: pass
-        threading.Thread(target=hide_after, daemon=True).start()
+        scheduler.call_later(2, self._hide_save_indicator, key=("hide_save_indicator", id(self)))
+
+    def _hide_save_indicator(self):
+        try:
+            self.save_indicator.visible = False
+            self.update()
+        except: pass
 
     def _update_original_data(self):
         self.original_data = self.get_data().copy()
         self.checklist_changed = False
 
-    def _load_attachments(self):
+    def _load_attachments(self, attachments=None):
         self.attachments_list.controls.clear()
         if not self.db_id:
             self.attachment_count = 0
@@ -1303,13 +2574,14 @@ class TaskRow(ft.Container):
             except: pass
             return
         
-        attachments = db.list_attachments(self.db_id)
+        if attachments is None:
+            attachments = db.list_attachments(self.db_id)
         self.attachment_count = len(attachments)
         
         for att in attachments:
             file_path = att['file_path']; file_name = os.path.basename(file_path)
             self.attachments_list.controls.append(
-                ft.Row([ # The text size here will be updated when update_font_sizes is called, as _load_attachments is called inside it.
+                ft.Row(data=att['id'], controls=[ # The text size here will be updated when update_font_sizes is called, as _load_attachments is called inside it.
                     ft.IconButton(icon=ft.Icons.OPEN_IN_NEW, tooltip=f"Open {file_path}", on_click=lambda e, p=file_path: self._open_attachment(p)),
                     ft.Text(file_name, tooltip=file_path, expand=True),
                     ft.IconButton(icon=ft.Icons.DELETE, icon_size=16, tooltip="Delete attachment", on_click=lambda e, att_id=att['id']: self._delete_attachment(att_id))
@@ -1337,8 +2609,12 @@ class TaskRow(ft.Container):
                 self.page.update()
 
     def _delete_attachment(self, attachment_id):
-        db.delete_attachment(attachment_id)
-        self._load_attachments()
+        db.writes.submit(("attachment", attachment_id), db.delete_attachment, attachment_id)
+        self.attachments_list.controls = [row for row in self.attachments_list.controls if row.data != attachment_id]
+        self.attachment_count = len(self.attachments_list.controls)
+        self._update_minimized_info()
+        try: self.update()
+        except: pass
         self.attachments_changed = True
         self._on_field_change()
 
@@ -1355,42 +2631,59 @@ class TaskRow(ft.Container):
         if e.files:
             self.handle_dropped_files(e.files)
 
-    def focus_and_expand(self):
+    def focus_and_expand(self, task_list=None):
         self.set_minimized(False, animated=True)
+        # Quem rola é o ListView que contém a row, até a key dela
+        task_list = task_list or self.parent
+        if not self.key or task_list is None or not hasattr(task_list, 'scroll_to'):
+            return
         
         if hasattr(self, 'page') and self.page and hasattr(self.page, 'app_instance') and hasattr(self.page.app_instance, 'animation_manager') and self.page.app_instance.animation_manager:
             # Use AnimationManager para scroll async
-            self.page.app_instance.animation_manager.request_play('task_scroll_to', self, duration=1.0, curve=ft.AnimationCurve.EASE_IN_OUT)
+            self.page.app_instance.animation_manager.request_play('task_scroll_to', task_list, duration=1.0, curve=ft.AnimationCurve.EASE_IN_OUT, key=self.key)
         else:
             # Fallback para scroll direto
-            self.scroll_to(duration=1000, curve=ft.AnimationCurve.EASE_IN_OUT)
-
-    def _get_due_color(self, days_diff):
-        is_light_theme = self.page and self.page.theme_mode == ft.ThemeMode.LIGHT
-
-        if days_diff < 0:
-            return ft.Colors.RED_700 if is_light_theme else ft.Colors.RED_400
-        if days_diff > 3:
-            return ft.Colors.ORANGE_700 if is_light_theme else ft.Colors.ORANGE_400
+            try: task_list.scroll_to(key=self.key, duration=1000, curve=ft.AnimationCurve.EASE_IN_OUT)
+            except: pass
 
+    @staticmethod
+    @lru_cache(maxsize=2)
+    def _due_palette(is_light_theme):
+        """Badge colors for one theme brightness, computed once: "overdue", "later" and days 0-3 (orange to red)."""
+        palette = {
+            "overdue": ft.Colors.RED_700 if is_light_theme else ft.Colors.RED_400,
+            "later": ft.Colors.ORANGE_700 if is_light_theme else ft.Colors.ORANGE_400,
+        }
         # Use darker shades for light theme for better contrast
         orange = (245, 124, 0) if is_light_theme else (255, 167, 38)  # ORANGE_700 vs ORANGE_400
         red = (211, 47, 47) if is_light_theme else (239, 83, 80)      # RED_700 vs RED_400
-        
-        factor = (3 - days_diff) / 3.0
-        
-        r = int(orange[0] + (red[0] - orange[0]) * factor)
-        g = int(orange[1] + (red[1] - orange[1]) * factor)
-        b = int(orange[2] + (red[2] - orange[2]) * factor)
-        
-        return f"#{r:02x}{g:02x}{b:02x}"
+        for days_diff in range(4):
+            factor = (3 - days_diff) / 3.0
+            r, g, b = (int(o + (d - o) * factor) for o, d in zip(orange, red))
+            palette[days_diff] = f"#{r:02x}{g:02x}{b:02x}"
+        return palette
+
+    def _is_light_theme(self):
+        return bool(self.page and self.page.theme_mode == ft.ThemeMode.LIGHT)
 
-    def set_notification_status(self, status, days_diff=None):
+    def _get_due_color(self, days_diff):
+        palette = TaskRow._due_palette(self._is_light_theme())
+        if days_diff < 0:
+            return palette["overdue"]
+        if days_diff > 3:
+            return palette["later"]
+        return palette[days_diff]
+
+    def set_notification_status(self, status, days_diff=None, update=True):
         self.notification_status = status
+        is_light_theme = self._is_light_theme() if status else None
+        # Nada mudou desde o último desenho: nenhuma mensagem para o cliente Flet
+        if (status, days_diff, is_light_theme) == self._notification_shown:
+            return
+        self._notification_shown = (status, days_diff, is_light_theme)
         if status == "overdue":
             self.minimized_due_date_info.visible = True
-            is_light_theme = self.page and self.page.theme_mode == ft.ThemeMode.LIGHT
-            color = ft.Colors.RED_700 if is_light_theme else ft.Colors.RED_400
+            color = TaskRow._due_palette(is_light_theme)["overdue"]
             self.minimized_due_date_info.controls[0].color = color
             self.minimized_due_date_info.controls[1].value = f"{-days_diff}d overdue"
             self.minimized_due_date_info.controls[1].color = color
@@ -1405,8 +2698,9 @@ class TaskRow(ft.Container):
                 self.main_container.bgcolor = self.original_bgcolor
             self.minimized_due_date_info.visible = False
         
-        try: self.update()
-        except: pass
+        if update:
+            try: self.update()
+            except: pass
 
     def did_mount(self):
         import time
@@ -1530,7 +2824,7 @@ class TaskRow(ft.Container):
         self.end_date_field.update()
         self._on_field_change()
         if hasattr(self.page, 'app_instance'):
-            self.page.app_instance.check_all_due_dates()
+            self.page.app_instance.refresh_task_due_date(self)
 
     def _on_status_change(self, e=None):
         v = (self.status_field.value or "").lower()
@@ -1555,8 +2849,7 @@ class TaskRow(ft.Container):
         }
 
     def save(self, e=None):
-        if self.auto_save_timer:
-            self.auto_save_timer.cancel()
+        scheduler.cancel(("auto_save", id(self)))
 
         if self.has_date_error:
             if hasattr(self, 'page') and self.page:
@@ -1565,13 +2858,14 @@ class TaskRow(ft.Container):
                 self.page.update()
             return
         self._save_checklist()
+        self._sync_model()
         self.on_save(self, self.get_data())
         self._update_original_data()
         self.attachments_changed = False
         self._show_save_indicator()
         
         if hasattr(self.page, 'app_instance'):
-            self.page.app_instance.check_all_due_dates()
+            self.page.app_instance.refresh_task_due_date(self)
 
     def delete(self, e=None):
         self.on_delete(self)
@@ -1651,6 +2945,7 @@ class DeleteTaskConfirmationDialog(ft.AlertDialog):
         self.actions_alignment = ft.MainAxisAlignment.END
 
     def generate_random_code(self, length=5):
+        import random
         letters = string.ascii_uppercase
         self.random_code = ''.join(random.choice(letters) for _ in range(length))
 
@@ -1723,7 +3018,7 @@ class SettingsDialog(ft.AlertDialog):
             ("Bounce", "bounce"),
         ]
         # Valor inicial da transição (pode ser lido do banco/config)
-        initial_transition = db.get_setting('carousel_transition', 'fade_slide')
+        initial_transition = db.settings.get('carousel_transition', 'fade_slide')
         self.carousel_transition_dropdown = ft.Dropdown(
             label="Transição do Carousel",
             options=[ft.dropdown.Option(key=val, text=label) for label, val in self.carousel_transition_options],
@@ -1917,10 +3212,36 @@ class SettingsDialog(ft.AlertDialog):
             expand=True
         )
 
+        # Painel de diagnóstico (escondido): métricas de tempo, contagem e bytes por operação
+        self.diagnostics_text = ft.Text("", font_family="Consolas", size=self.scale_func(9), selectable=True)
+        self.diagnostics_status = ft.Text("", size=self.scale_func(9), selectable=True)
+        self.diagnostics_panel = ft.Column(
+            [
+                ft.Divider(height=1),
+                ft.Row(
+                    [
+                        ft.TextButton("Refresh", icon=ft.Icons.REFRESH, on_click=self._refresh_diagnostics),
+                        ft.TextButton("Reset", icon=ft.Icons.RESTART_ALT, on_click=self._reset_diagnostics),
+                        ft.TextButton("Export JSON", icon=ft.Icons.SAVE_ALT, on_click=self._export_diagnostics),
+                    ],
+                    alignment=ft.MainAxisAlignment.CENTER,
+                ),
+                self.diagnostics_status,
+                ft.Container(content=self.diagnostics_text, padding=ft.padding.all(self.scale_func(6))),
+            ],
+            visible=False,
+            spacing=self.scale_func(4),
+            horizontal_alignment=ft.CrossAxisAlignment.CENTER,
+        )
+
         about_tab_content = ft.Container(
             content=ft.Column(
                 [
-                    ft.Text(f"{APP_NAME} - {VERSION}", size=self.scale_func(16), weight=ft.FontWeight.BOLD),
+                    # Pressionar e segurar o nome do app abre o painel de diagnóstico
+                    ft.GestureDetector(
+                        content=ft.Text(f"{APP_NAME} - {VERSION}", size=self.scale_func(16), weight=ft.FontWeight.BOLD),
+                        on_long_press_start=self._toggle_diagnostics,
+                    ),
                     ft.Container(height=self.scale_func(8)),
                     ft.Text("A simple and effective to-do list application.", size=self.scale_func(12)),
                     ft.Divider(height=1),
@@ -1939,6 +3260,7 @@ class SettingsDialog(ft.AlertDialog):
                         ),
                         margin=ft.margin.symmetric(horizontal=self.scale_func(10))
                     ),
+                    self.diagnostics_panel,
                 ],
                 horizontal_alignment=ft.CrossAxisAlignment.CENTER,
                 spacing=self.scale_func(8),
@@ -2031,6 +3353,32 @@ class SettingsDialog(ft.AlertDialog):
             db.set_setting('carousel_transition', self.carousel_transition_dropdown.value)
         self.on_carousel_settings_change()
 
+    def _toggle_diagnostics(self, e):
+        self.diagnostics_panel.visible = not self.diagnostics_panel.visible
+        if self.diagnostics_panel.visible:
+            self._refresh_diagnostics(e)
+        else:
+            try: self.update()
+            except: pass
+
+    def _refresh_diagnostics(self, e):
+        self.diagnostics_text.value = metrics.summary()
+        try: self.update()
+        except: pass
+
+    def _reset_diagnostics(self, e):
+        metrics.reset()
+        self.diagnostics_status.value = "Metrics reset."
+        self._refresh_diagnostics(e)
+
+    def _export_diagnostics(self, e):
+        path = os.path.join(APP_DATA_DIR, f"metrics-{VERSION}-{datetime.now():%Y%m%d-%H%M%S}.json")
+        try:
+            self.diagnostics_status.value = f"Exported to {metrics.export(path)}"
+        except Exception as ex:
+            self.diagnostics_status.value = f"Export failed: {ex}"
+        self._refresh_diagnostics(e)
+
     def close_dialog(self, e):
         self.open = False
         self.on_close()
@@ -2042,6 +3390,9 @@ class MiniViewCarousel(ft.Container):
         self.current_tab_index = 0
         self._thread = None
         self._stop_event = threading.Event()
+        # Acorda a espera entre slides quando a velocidade muda
+        self._wake_event = threading.Event()
+        db.settings.subscribe('carousel_speed', self._on_speed_change)
 
         # Initialize with a placeholder content
         # Fundo sempre totalmente transparente
@@ -2060,17 +3411,17 @@ class MiniViewCarousel(ft.Container):
         """Creates the UI for a single slide."""
         tab_name = ft.Text(tab_name_str, weight=ft.FontWeight.BOLD, size=self.scale_func(12), text_align=ft.TextAlign.CENTER, no_wrap=True)
         
-        show_progress = db.get_setting('carousel_show_progress', 'True') == 'True'
+        show_progress = db.settings.get_bool('carousel_show_progress', True)
         progress_bar = ft.ProgressBar(bar_height=self.scale_func(6), expand=True, value=stats.get("progress", 0), visible=show_progress)        
         
         stats_controls = []
-        if db.get_setting('carousel_show_total', 'True') == 'True':
+        if db.settings.get_bool('carousel_show_total', True):
             stats_controls.append(self._create_stat_display(ft.Icons.FUNCTIONS, ft.Colors.BLUE, "Total Tasks", stats.get("total", "0")))
-        if db.get_setting('carousel_show_ongoing', 'True') == 'True':
+        if db.settings.get_bool('carousel_show_ongoing', True):
             stats_controls.append(self._create_stat_display(ft.Icons.LOOP, ft.Colors.ORANGE, "Ongoing", stats.get("ongoing", "0")))
-        if db.get_setting('carousel_show_completed', 'True') == 'True':
+        if db.settings.get_bool('carousel_show_completed', True):
             stats_controls.append(self._create_stat_display(ft.Icons.CHECK_CIRCLE_OUTLINE, ft.Colors.GREEN, "Complete", stats.get("completed", "0")))
-        if db.get_setting('carousel_show_overdue', 'True') == 'True':
+        if db.settings.get_bool('carousel_show_overdue', True):
             stats_controls.append(self._create_stat_display(ft.Icons.ERROR_OUTLINE, ft.Colors.RED, "Overdue", stats.get("overdue", "0")))
 
         return ft.Column(
@@ -2112,11 +3463,16 @@ class MiniViewCarousel(ft.Container):
     def start_carousel(self):
         if self._thread is None or not self._thread.is_alive():
             self._stop_event.clear()
+            self._wake_event.clear()
             self._thread = threading.Thread(target=self._run, daemon=True)
             self._thread.start()
 
     def stop_carousel(self):
         self._stop_event.set()
+        self._wake_event.set()
+
+    def _on_speed_change(self, key, value):
+        self._wake_event.set()
 
     def _run(self):
         time.sleep(2)
@@ -2126,8 +3482,11 @@ class MiniViewCarousel(ft.Container):
                     # This method now runs in the background and orchestrates UI updates
                     self._perform_transition()
 
-                speed = int(db.get_setting('carousel_speed', '5'))
-                self._stop_event.wait(speed)
+                speed = db.settings.get_int('carousel_speed', 5)
+                # Uma mudança de velocidade interrompe a espera e recomeça com o novo intervalo
+                while self._wake_event.wait(speed) and not self._stop_event.is_set():
+                    self._wake_event.clear()
+                    speed = db.settings.get_int('carousel_speed', 5)
             except Exception as e:
                 print(f"Error in MiniViewCarousel thread: {e}")
                 time.sleep(5)
@@ -2179,7 +3538,7 @@ class MiniViewCarousel(ft.Container):
 
         # Try to use AnimationManager for all transitions
         if self.app and hasattr(self.app, 'animation_manager') and self.app.animation_manager:
-            transition = db.get_setting('carousel_transition', 'fade_slide')
+            transition = db.settings.get('carousel_transition', 'fade_slide')
             anim_duration = 0.35
             
             # Map transition names to AnimationManager methods
@@ -2223,7 +3582,7 @@ class MiniViewCarousel(ft.Container):
                 except: pass
             run_on_ui(update_action)
 
-        transition = db.get_setting('carousel_transition', 'fade_slide')
+        transition = db.settings.get('carousel_transition', 'fade_slide')
         anim_duration = 0.35
 
         # Reset state before each animation
@@ -2292,6 +3651,12 @@ class MiniViewCarousel(ft.Container):
 # ---- AgendaTab ----
 class AgendaTab(ft.Column):
     PRIORITY_ORDER = {"Critical": 0, "Normal": 1, "Not Urgent": 2}
+    # TaskRows criadas por vez em cada lista; as demais nascem ao rolar perto de uma ponta
+    ROW_WINDOW = 30
+    # Máximo de TaskRows montadas por lista: as que saem da janela são liberadas
+    MAX_ROWS = 3 * ROW_WINDOW
+    # Anos antes/depois do atual que o seletor do gráfico preenche como faixa contínua
+    CHART_YEAR_WINDOW = 10
 
     def __init__(self, tab_name, on_delete_tab_request, page, delete_dialog, get_auto_save_setting, scale_func, base_font_size):
         self.tab_name = tab_name
@@ -2300,12 +3665,26 @@ class AgendaTab(ft.Column):
         self.delete_dialog = delete_dialog
         self.reorder_mode_active = False
         self.base_font_size = base_font_size
+        # Abas não visíveis na inicialização só constroem as TaskRows quando selecionadas
+        self.is_loaded = False
+        # A hidratação em segundo plano, um clique na aba e a rolagem podem chegar juntos:
+        # uma thread por vez mexe nas tasks pendentes e nas listas
+        self._load_lock = threading.RLock()
+        # Todas as tasks da aba como dados puros; `rows` liga cada Task à sua TaskRow
+        self.store = TaskStore()
+        self._overview_counts = None  # últimos números desenhados nos cards
+        self._arrow_edges = {}  # id(lista) -> (primeira, última) TaskRow com seta desabilitada
+        self.rows = {}
+        # Cada lista mostra uma janela da sequência de Tasks; fora dela ficam só os dados,
+        # por lista ("Ongoing"/"Complete"): acima da janela e abaixo dela
+        self._above = {"Ongoing": [], "Complete": []}
+        self._below = {"Ongoing": [], "Complete": []}
 
         # ListView simples sem DragTarget para tasks
         self.get_auto_save_setting = get_auto_save_setting
         self.scale_func = scale_func # Store scale function
-        self.ongoing_list = ft.ListView(expand=True, spacing=self.scale_func(10), padding=self.scale_func(10))
-        self.complete_list = ft.ListView(expand=True, spacing=self.scale_func(10), padding=self.scale_func(10))
+        self.ongoing_list = ft.ListView(expand=True, spacing=self.scale_func(10), padding=self.scale_func(10), on_scroll=self._on_list_scroll, on_scroll_interval=100)
+        self.complete_list = ft.ListView(expand=True, spacing=self.scale_func(10), padding=self.scale_func(10), on_scroll=self._on_list_scroll, on_scroll_interval=100)
 
         # --- Controles para a aba Overview ---
         self.overview_total_tasks = ft.Text("0", weight=ft.FontWeight.BOLD, size=self.scale_func(28))
@@ -2326,8 +3705,8 @@ class AgendaTab(ft.Column):
             width=self.scale_func(120),
             text_style=ft.TextStyle(size=self.scale_func(self.base_font_size)),
             content_padding=ft.padding.symmetric(vertical=self.scale_func(5), horizontal=self.scale_func(10)),
-            options=[ft.dropdown.Option(str(y)) for y in range(2025, 2041)],
-            value=str(datetime.now().year) if 2025 <= datetime.now().year <= 2040 else "2025"
+            options=[ft.dropdown.Option(str(datetime.now().year))],
+            value=str(datetime.now().year)
         )
         self.tasks_chart = ft.LineChart(
             tooltip_bgcolor=ft.Colors.with_opacity(0.8, ft.Colors.BLUE_GREY),
@@ -2393,6 +3772,12 @@ class AgendaTab(ft.Column):
         self.delete_tab_btn = ft.IconButton(icon=ft.Icons.DELETE, tooltip="Delete Tab", on_click=lambda e: self.on_delete_tab_request(self.tab_name))
         self.buttons_row = ft.Row([self.reorder_mode_btn, self.toggle_all_tasks_btn, ft.Container(expand=True), self.add_task_btn, self.delete_tab_btn], alignment=ft.MainAxisAlignment.END, vertical_alignment=ft.CrossAxisAlignment.CENTER, spacing=self.scale_func(10))
 
+        self.loading_placeholder = ft.Container(
+            content=ft.ProgressRing(width=self.scale_func(32), height=self.scale_func(32)),
+            alignment=ft.alignment.center,
+            expand=True
+        )
+
         super().__init__(spacing=self.scale_func(12), expand=True, controls=[self.inner_tabs, self.buttons_row])
 
     def _create_stat_card(self, title: str, value_control: ft.Control, icon: str, icon_color: str, on_click):
@@ -2459,18 +3844,24 @@ class AgendaTab(ft.Column):
             pass
 
     def _populate_chart_selectors(self):
-        # Agora fixa os anos de 2025 a 2040
-        self.chart_year_selector.options = [ft.dropdown.Option(str(y)) for y in range(2025, 2041)]
+        # Faixa contínua com os anos das tasks até CHART_YEAR_WINDOW anos do atual; anos
+        # mais distantes (ex.: um ano digitado errado) entram sozinhos, sem puxar a faixa
         current_year = datetime.now().year
-        if 2025 <= current_year <= 2040:
+        years = set(self.store.years)
+        near = {y for y in years if abs(y - current_year) <= self.CHART_YEAR_WINDOW} | {current_year}
+        years |= set(range(min(near), max(near) + 1))
+        options = [str(y) for y in sorted(years)]
+        if options == [o.key for o in self.chart_year_selector.options or []]:
+            return
+        self.chart_year_selector.options = [ft.dropdown.Option(y) for y in options]
+        if self.chart_year_selector.value not in options:
             self.chart_year_selector.value = str(current_year)
-        else:
-            self.chart_year_selector.value = "2025"
         try:
             self.chart_year_selector.update()
         except:
             pass
 
+    @metrics.timed("tab.update_chart")
     def _update_chart(self, e=None):
         if not hasattr(self, 'page') or not self.page or not self.chart_year_selector.value:
             self.tasks_chart.data_series = []
@@ -2479,31 +3870,9 @@ class AgendaTab(ft.Column):
             return
 
         selected_year = int(self.chart_year_selector.value)
-        all_tasks = self.ongoing_list.controls + self.complete_list.controls
-        now = datetime.now()
-        counts = {i: 0 for i in range(12)}
-
-        for task in all_tasks:
-            if not isinstance(task, TaskRow): continue
-            start_date = TaskRow._parse_date(task.start_date_field.value)
-            end_date = TaskRow._parse_date(task.end_date_field.value)
-            status = (task.status_field.value or '').lower()
-
-            if self.selected_status_for_chart == "total":
-                # Conta todas as tarefas criadas no mês
-                if start_date and start_date.year == selected_year:
-                    counts[start_date.month - 1] += 1
-            elif self.selected_status_for_chart == "ongoing":
-                if status == "ongoing" and start_date and start_date.year == selected_year:
-                    counts[start_date.month - 1] += 1
-            elif self.selected_status_for_chart == "completed":
-                if status == "complete" and end_date and end_date.year == selected_year:
-                    counts[end_date.month - 1] += 1
-            elif self.selected_status_for_chart == "overdue":
-                if status != "complete" and end_date and end_date.year == selected_year and end_date.replace(hour=23, minute=59) < now:
-                    counts[end_date.month - 1] += 1
-
-        max_y = max(counts.values()) if all_tasks else 0
+        counts = dict(enumerate(self.store.monthly_counts(self.selected_status_for_chart, selected_year)))
+
+        max_y = max(counts.values())
         top_y = 5 if max_y < 5 else (math.ceil(max_y / 5)) * 5
         self.tasks_chart.max_y = top_y
         self.tasks_chart.horizontal_grid_lines.interval = max(1, top_y / 5)
@@ -2537,24 +3906,50 @@ class AgendaTab(ft.Column):
             title_text = card.content.controls[0].controls[1]
             title_text.size = self.scale_func(self.base_font_size)
 
-        # Update tasks
-        for task_list in [self.ongoing_list, self.complete_list]:
-            for task in task_list.controls:
-                if isinstance(task, TaskRow):
-                    task.update_font_sizes()
+        # Update tasks (montadas ou retidas fora da janela)
+        for task in list(self.rows.values()):
+            task.update_font_sizes()
         try: self.update()
         except: pass
 
+    def defer_tasks(self, tasks):
+        """Keeps the task data without building rows; `ensure_loaded` hydrates the tab later.
+
+        The overview counters are filled from the plain data so the mini-view
+        carousel shows correct numbers for tabs that were never opened.
+        """
+        self._set_tasks(tasks)
+        self.controls = [self.loading_placeholder]
+        self.update_overview_stats()
+
+    @metrics.timed("tab.ensure_loaded")
+    def ensure_loaded(self):
+        """Builds the task rows of a deferred tab. Safe to call repeatedly, from any thread."""
+        if self.is_loaded:
+            return
+        with self._load_lock:
+            # Quem esperou o lock encontra a aba já montada
+            if self.is_loaded:
+                return
+            self.controls = [self.inner_tabs, self.buttons_row]
+            self._render_loaded_tasks()
+
+    def _set_tasks(self, tasks):
+        """Fills the store from `db.load_all_tasks` dicts (already in position order) without building rows."""
+        for t in tasks:
+            model = Task.from_dict(t)
+            self.store.add(model)
+            self._below["Ongoing" if model.is_ongoing else "Complete"].append(model)
+
     def update_overview_stats(self):
-        ongoing_tasks = self.ongoing_list.controls
-        completed_tasks = self.complete_list.controls
-        all_tasks = ongoing_tasks + completed_tasks
-
-        total_count = len(all_tasks)
-        ongoing_count = len(ongoing_tasks)
-        completed_count = len(completed_tasks)
-        overdue_count = sum(1 for task in ongoing_tasks if isinstance(task, TaskRow) and task.notification_status == "overdue")
-        
+        self._set_overview_counts(*self.store.counts())
+
+    def _set_overview_counts(self, total_count, ongoing_count, completed_count, overdue_count):
+        # Mesmos números já na tela: não manda update
+        counts = (total_count, ongoing_count, completed_count, overdue_count)
+        if counts == self._overview_counts:
+            return
+        self._overview_counts = counts
         completion_percentage = (completed_count / total_count) if total_count > 0 else 0
 
         self.overview_total_tasks.value = str(total_count)
@@ -2569,7 +3964,7 @@ class AgendaTab(ft.Column):
 
     def toggle_reorder_mode(self, e):
         self.reorder_mode_active = not self.reorder_mode_active
-        
+
         if self.reorder_mode_active:
             self.reorder_mode_btn.icon = ft.Icons.LOCK
             self.reorder_mode_btn.tooltip = "Disable reordering (lock order)"
@@ -2588,19 +3983,24 @@ class AgendaTab(ft.Column):
             # Fallback para rotação direta
             self.reorder_mode_btn.rotate.angle = new_angle
 
-        all_tasks = self.ongoing_list.controls + self.complete_list.controls
-        for task in all_tasks:
-            if isinstance(task, TaskRow):
-                task.set_reorder_mode(self.reorder_mode_active)
-                # Minimiza todas as tarefas ao entrar no modo de reordenação
-                if self.reorder_mode_active:
-                    task.set_minimized(True, animated=True)
+        # Só as rows montadas (e as retidas com edição pendente); as próximas nascem já no modo certo
+        for task in list(self.rows.values()):
+            task.set_reorder_mode(self.reorder_mode_active)
+            # Minimiza todas as tarefas ao entrar no modo de reordenação
+            if self.reorder_mode_active:
+                task.set_minimized(True, animated=task.page is not None)
         if self.reorder_mode_active:
             self.update_arrow_states()
         try:
             self.update()
         except: pass
 
+    def _ui_batch(self, action):
+        """`AgendaApp.ui_batch` when the tab is on a page with an app; a no-op otherwise."""
+        app = getattr(self.page, 'app_instance', None) if self.page else None
+        return app.ui_batch(action) if app else nullcontext()
+
+    @metrics.timed("tab.toggle_all_tasks")
     def toggle_all_tasks(self, e):
         all_tasks = self.ongoing_list.controls + self.complete_list.controls
         if not all_tasks:
@@ -2608,30 +4008,33 @@ class AgendaTab(ft.Column):
 
         should_minimize = any(not task.is_minimized for task in all_tasks)
 
-        for task in all_tasks:
-            task.set_minimized(should_minimize, animated=True)
-
-        if should_minimize:
-            self.toggle_all_tasks_btn.icon = ft.Icons.UNFOLD_MORE
-            self.toggle_all_tasks_btn.tooltip = "Maximize All"
-        else:
-            self.toggle_all_tasks_btn.icon = ft.Icons.UNFOLD_LESS
-            self.toggle_all_tasks_btn.tooltip = "Minimize All"
-        try:
-            self.toggle_all_tasks_btn.update()
-        except:
-            pass
-
-    def load_tasks(self):
-        tasks = db.list_tasks(self.tab_name)
-        tasks.sort(key=lambda t: self.PRIORITY_ORDER.get(t.get("priority", "Normal"), 99))
+        with self._ui_batch("toggle_all_tasks"):
+            for task in all_tasks:
+                task.set_minimized(should_minimize, animated=True)
 
-        for t in tasks:
-            row = TaskRow(self.on_save_task, self.on_delete_task, self.on_duplicate_task, self.on_move_task_up, self.on_move_task_down, title=t["title"], task=t["task"], start_date=t["start_date"], end_date=t["end_date"], status=t["status"], priority=t["priority"], db_id=t["id"], get_auto_save_setting=self.get_auto_save_setting, scale=self.scale_func, base_font_size=self.base_font_size)
-            if t["status"] == "Ongoing":
-                self.ongoing_list.controls.append(row)
+            if should_minimize:
+                self.toggle_all_tasks_btn.icon = ft.Icons.UNFOLD_MORE
+                self.toggle_all_tasks_btn.tooltip = "Maximize All"
             else:
-                self.complete_list.controls.append(row)
+                self.toggle_all_tasks_btn.icon = ft.Icons.UNFOLD_LESS
+                self.toggle_all_tasks_btn.tooltip = "Minimize All"
+            try:
+                self.toggle_all_tasks_btn.update()
+            except:
+                pass
+
+    @metrics.timed("tab.load_tasks")
+    def load_tasks(self, tasks=None):
+        """Builds the task rows. `tasks` comes from `db.load_all_tasks`; when omitted this tab is loaded on its own."""
+        if tasks is None:
+            tasks = db.load_all_tasks(self.tab_name).get(self.tab_name, [])
+        self._set_tasks(tasks)
+        self._render_loaded_tasks()
+
+    def _render_loaded_tasks(self):
+        self._render_more(self.ongoing_list)
+        self._render_more(self.complete_list)
+        self.is_loaded = True
         self.update_arrow_states()
         self.update_overview_stats()
         self._populate_chart_selectors()
@@ -2639,9 +4042,174 @@ class AgendaTab(ft.Column):
         try: self.update()
         except: pass
 
+    def _build_row(self, task):
+        row = TaskRow(self.on_save_task, self.on_delete_task, self.on_duplicate_task, self.on_move_task_up, self.on_move_task_down, get_auto_save_setting=self.get_auto_save_setting, scale=self.scale_func, base_font_size=self.base_font_size, model=task)
+        row.key = f"task-{task.id}"
+        self.rows[task] = row
+        if task.notification_status:
+            row.set_notification_status(task.notification_status, task.days_diff)
+        row.set_reorder_mode(self.reorder_mode_active)
+        if self.reorder_mode_active:
+            row.set_minimized(True, animated=False)
+        return row
+
+    def _status_key(self, task_list):
+        return "Ongoing" if task_list is self.ongoing_list else "Complete"
+
+    def _sequence(self, task_list):
+        """Every Task of a list in display order: above the window, mounted, below it."""
+        status = self._status_key(task_list)
+        return self._above[status] + [c.model for c in task_list.controls if isinstance(c, TaskRow)] + self._below[status]
+
+    @staticmethod
+    def _can_release(row):
+        # Row com edição ainda não gravada (ou task nova sem id) não é descartada
+        return bool(row.db_id) and not row.has_changes and not row.has_date_error and not scheduler.pending(("auto_save", id(row)))
+
+    def _set_window(self, task_list, start, end):
+        """Mounts the rows of tasks [start, end) of a list and returns the rows built for it.
+
+        Rows that leave the window are released unless they hold unsaved
+        edits; those stay in `rows` and come back as they were.
+        """
+        with self._load_lock:
+            status = self._status_key(task_list)
+            sequence = self._sequence(task_list)
+            start = max(0, min(start, len(sequence)))
+            end = max(start, min(end, len(sequence)))
+            window = sequence[start:end]
+            previous = {id(c) for c in task_list.controls}
+            built = []
+            controls = []
+            for task in window:
+                row = self.rows.get(task)
+                if row is None:
+                    row = self._build_row(task)
+                    built.append(row)
+                elif id(row) not in previous:
+                    # Row retida voltando para a lista: as setas são recalculadas por update_arrow_states
+                    row.move_up_btn.disabled = row.move_down_btn.disabled = False
+                controls.append(row)
+            task_list.controls[:] = controls
+            self._above[status] = sequence[:start]
+            self._below[status] = sequence[end:]
+            # Solta as rows fora das duas janelas, inclusive retidas que já gravaram a edição
+            mounted = {id(c) for lst in (self.ongoing_list, self.complete_list) for c in lst.controls}
+            for task, row in list(self.rows.items()):
+                if id(row) not in mounted and self._can_release(row):
+                    del self.rows[task]
+        return built
+
+    def _window(self, task_list):
+        """(start, end) of the mounted rows of a list within its whole sequence."""
+        start = len(self._above[self._status_key(task_list)])
+        return start, start + len(task_list.controls)
+
+    def _render_more(self, task_list):
+        """Mounts the next ROW_WINDOW tasks below the window, releasing rows above it past MAX_ROWS."""
+        with self._load_lock:
+            start, end = self._window(task_list)
+            end = min(end + self.ROW_WINDOW, end + len(self._below[self._status_key(task_list)]))
+            return self._set_window(task_list, max(start, end - self.MAX_ROWS), end)
+
+    def _render_earlier(self, task_list):
+        """Mounts the ROW_WINDOW tasks above the window, releasing rows below it past MAX_ROWS."""
+        with self._load_lock:
+            start, end = self._window(task_list)
+            start = max(0, start - self.ROW_WINDOW)
+            return self._set_window(task_list, start, min(end, start + self.MAX_ROWS))
+
+    def _show_top(self, task_list):
+        """Moves the window of a list back to its first tasks (where new and moved tasks go)."""
+        if not self._above[self._status_key(task_list)]:
+            return
+        rows = self._set_window(task_list, 0, self.ROW_WINDOW)
+        if rows:
+            self.refresh_due_dates(rows)
+        try: task_list.scroll_to(offset=0, duration=0)
+        except: pass
+
+    @metrics.timed("tab.render_all")
+    def render_all(self):
+        """Mounts every row of both lists (benchmarks and exports; the UI keeps a bounded window)."""
+        rows = []
+        for task_list in (self.ongoing_list, self.complete_list):
+            rows += self._set_window(task_list, 0, len(self._sequence(task_list)))
+        if rows:
+            self.refresh_due_dates(rows)
+            self.update_arrow_states()
+        return rows
+
+    def _on_list_scroll(self, e):
+        if e.pixels is None or e.max_scroll_extent is None:
+            return
+        task_list = e.control
+        status = self._status_key(task_list)
+        viewport = e.viewport_dimension or 0
+        mounted = len(task_list.controls)
+        above = len(self._above[status])
+        # Perto de uma ponta (menos de uma tela): monta a próxima janela daquele lado e solta a do outro
+        if e.max_scroll_extent - e.pixels <= viewport and self._below[status]:
+            rows = self._render_more(task_list)
+        elif e.pixels <= viewport and self._above[status]:
+            rows = self._render_earlier(task_list)
+        else:
+            return
+        self.refresh_due_dates(rows)
+        self.update_arrow_states()
+        try: task_list.update()
+        except: pass
+        # Rows criadas/soltas acima da tela mudam o offset: compensa pela altura média medida
+        shift = above - len(self._above[status])
+        if shift and mounted:
+            row_height = (e.max_scroll_extent + viewport) / mounted
+            try: task_list.scroll_to(offset=max(0, e.pixels + shift * row_height), duration=0)
+            except: pass
+
+    @metrics.timed("tab.reveal_task")
+    def reveal_task(self, task_id):
+        """Materializes the row of `task_id` if needed, shows its list and expands it. Returns the row or None."""
+        self.ensure_loaded()
+        task = next((t for t in self.store if t.id == task_id), None)
+        if task is None:
+            return None
+        task_list = self.ongoing_list if task.is_ongoing else self.complete_list
+        row = self.rows.get(task)
+        if row is None or row not in task_list.controls:
+            # Fora da janela: centraliza a janela na task
+            sequence = self._sequence(task_list)
+            if task not in sequence:
+                return None
+            start = max(0, min(sequence.index(task) - self.ROW_WINDOW // 2, len(sequence) - self.ROW_WINDOW))
+            rows = self._set_window(task_list, start, start + self.ROW_WINDOW)
+            self.refresh_due_dates(rows)
+            self.update_arrow_states()
+            row = self.rows.get(task)
+        self.inner_tabs.selected_index = 1 if task.is_ongoing else 2
+        try: self.update()
+        except: pass
+        row.focus_and_expand(task_list)
+        return row
+
+    @metrics.timed("tab.refresh_due_dates")
+    def refresh_due_dates(self, rows=None, tasks=None):
+        """Recomputes due-date notifications on the task data (default: the whole store).
+
+        Only rows whose status or day count actually changed are touched, and
+        the tasks are (re)scheduled in `due_dates` for their next change.
+        """
+        today = TaskStore._midnight()
+        if tasks is None:
+            tasks = list(self.store) if rows is None else [row.model for row in rows]
+        for task in tasks:
+            if task.compute_due_status(today) and (row := self.rows.get(task)):
+                row.set_notification_status(task.notification_status, task.days_diff)
+        due_dates.track(tasks, today)
+        self.update_overview_stats()
+
+    @metrics.timed("tab.add_task")
     def add_task(self, e=None, data=None):
         import time
-        import threading
         
         # Proteção contra execuções simultâneas
         if not hasattr(self, '_add_task_busy'):
@@ -2657,10 +4225,9 @@ class AgendaTab(ft.Column):
             if time_diff < 0.5:  # Aumentado de 300ms para 500ms
                 return None
                 
-        # Cancela debounce anterior se existir
-        if hasattr(self, '_add_task_debounce_timer'):
-            if self._add_task_debounce_timer and self._add_task_debounce_timer.is_alive():
-                return None  # Ignora cliques durante debounce
+        # Ignora cliques durante o debounce anterior
+        if scheduler.pending(("add_task_update", id(self))):
+            return None
         
         # Marca como busy
         self._add_task_busy = True
@@ -2682,6 +4249,10 @@ class AgendaTab(ft.Column):
             row.set_reorder_mode(self.reorder_mode_active)
             
             target_list = self.ongoing_list if row.status_field.value == "Ongoing" else self.complete_list
+            self._show_top(target_list)
+            self._place_task(row.model, None, self._first_task(target_list))
+            self.store.add(row.model)
+            self.rows[row.model] = row
             target_list.controls.insert(0, row)
 
             self.update_overview_stats()
@@ -2693,23 +4264,16 @@ class AgendaTab(ft.Column):
             if (self.get_auto_save_setting and self.get_auto_save_setting()) and not data:
                 row.save()
             
-            # Debounce para page.update com cancelamento de timer anterior
+            # Debounce para page.update
             def debounced_update():
-                time.sleep(0.2)  # 200ms debounce
                 try:
                     self.page.update()
                 except:
                     pass
                 finally:
                     self._add_task_busy = False  # Libera busy flag após update
-                    
-            # Cancela timer anterior e cria novo
-            if hasattr(self, '_add_task_debounce_timer') and self._add_task_debounce_timer and self._add_task_debounce_timer.is_alive():
-                # Timer anterior ainda rodando, será cancelado automaticamente
-                pass
-                
-            self._add_task_debounce_timer = threading.Timer(0.2, debounced_update)
-            self._add_task_debounce_timer.start()
+
+            scheduler.call_later(0.2, debounced_update, key=("add_task_update", id(self)))
             
             return row
             
@@ -2723,18 +4287,37 @@ class AgendaTab(ft.Column):
     def on_move_task_down(self, task_row):
         self._move_task(task_row, 1)
 
+    @metrics.timed("tab.reorder_task")
     def _move_task(self, task_row, direction: int):
         active_list = self.ongoing_list if task_row.status_field.value == "Ongoing" else self.complete_list
         
-        try:
-            current_index = active_list.controls.index(task_row)
-        except ValueError:
-            return
+        status = self._status_key(active_list)
+
+        with self._load_lock:
+            try:
+                current_index = active_list.controls.index(task_row)
+            except ValueError:
+                return
 
-        new_index = current_index + direction
-        if 0 <= new_index < len(active_list.controls):
+            new_index = current_index + direction
+            # Vizinho fora da janela: monta só a row dele para a troca acontecer na lista
+            start, end = self._window(active_list)
+            if new_index < 0 and self._above[status]:
+                self.refresh_due_dates(self._set_window(active_list, start - 1, end))
+                current_index += 1
+                new_index += 1
+            elif new_index >= len(active_list.controls) and self._below[status]:
+                self.refresh_due_dates(self._set_window(active_list, start, end + 1))
+            if not 0 <= new_index < len(active_list.controls):
+                return
             active_list.controls.pop(current_index)
             active_list.controls.insert(new_index, task_row)
+            # Nova posição a partir dos vizinhos na sequência inteira, dentro ou fora da janela
+            controls = active_list.controls
+            above, below = self._above[status], self._below[status]
+            before = controls[new_index - 1].model if new_index > 0 else (above[-1] if above else None)
+            after = controls[new_index + 1].model if new_index + 1 < len(controls) else (below[0] if below else None)
+            self._place_task(task_row.model, before, after)
             self.update_arrow_states()
             self._update_chart()
             try:
@@ -2742,17 +4325,87 @@ class AgendaTab(ft.Column):
             except:
                 pass
 
-    def update_arrow_states(self):
-        for lst in (self.ongoing_list, self.complete_list):
-            controls = lst.controls
-            for i, task in enumerate(controls):
-                if isinstance(task, TaskRow):
-                    task.move_up_btn.disabled = (i == 0)
-                    task.move_down_btn.disabled = (i == len(controls) - 1)
-                    try:
-                        task.update()
-                    except:
-                        pass
+    def _first_task(self, task_list, exclude=None):
+        """First Task of a list, mounted or not, skipping `exclude`."""
+        status = self._status_key(task_list)
+        mounted = (c.model for c in task_list.controls if isinstance(c, TaskRow))
+        return next((t for t in itertools.chain(self._above[status], mounted, self._below[status]) if t is not exclude), None)
+
+    def _place_task(self, task, before, after):
+        """Gives `task` a position between its new neighbours (Tasks or None) and persists only that row."""
+        exhausted = False
+        if before is None and after is None:
+            position = task.position
+        elif before is None:
+            position = after.position - POSITION_GAP
+        elif after is None:
+            position = before.position + POSITION_GAP
+        else:
+            position = (before.position + after.position) / 2
+            exhausted = after.position - position < 1e-6
+        task.position = position
+        if exhausted:
+            # Pontos médios esgotaram a precisão: renumera a aba toda (a linha já está no lugar novo)
+            self._rebalance_positions()
+        elif task.id:
+            db.writes.submit(("task_position", task.id), db.set_task_position, task.id, position)
+
+    def _rebalance_positions(self):
+        """Spreads the tab's positions back to POSITION_GAP apart, keeping the order of both lists.
+
+        Runs on the UI thread, which owns the lists and the Task positions;
+        only the database write goes through the write-behind queue.
+        """
+        ordered = self._sequence(self.ongoing_list) + self._sequence(self.complete_list)
+        for index, task in enumerate(ordered, start=1):
+            task.position = index * POSITION_GAP
+        db.writes.submit(("rebalance_positions", self.tab_name), db.set_task_positions,
+                         [(task.position, task.id) for task in ordered if task.id])
+
+    def update_arrow_states(self, full=False):
+        """Disables "move up" on the first task and "move down" on the last task of each list.
+
+        Only the first and last rows can have a disabled arrow, and only when
+        the window reaches that end of the list, so it is enough to look at
+        the rows that were at the edges last time and the ones at the window
+        edges now: at most four rows per list, and only those whose state
+        changed get an update. `full=True` walks every mounted row instead.
+        """
+        lists = (self.ongoing_list, self.complete_list)
+        edges = {}
+        window_edges = []
+        for lst in lists:
+            status = self._status_key(lst)
+            rows = [c for c in (lst.controls[0], lst.controls[-1]) if isinstance(c, TaskRow)] if lst.controls else []
+            window_edges += rows
+            edges[id(lst)] = (rows[0] if rows and not self._above[status] else None,
+                              rows[-1] if rows and not self._below[status] else None)
+        firsts = {id(first) for first, _ in edges.values() if first is not None}
+        lasts = {id(last) for _, last in edges.values() if last is not None}
+
+        if full:
+            candidates = [c for lst in lists for c in lst.controls if isinstance(c, TaskRow)]
+        else:
+            candidates = {id(row): row for row in window_edges}
+            for first, last in self._arrow_edges.values():
+                for row in (first, last):
+                    if row is not None:
+                        candidates[id(row)] = row
+            candidates = candidates.values()
+        self._arrow_edges = edges
+
+        for row in candidates:
+            self._set_arrow_state(row, id(row) in firsts, id(row) in lasts)
+
+    def _set_arrow_state(self, row, is_first, is_last):
+        if bool(row.move_up_btn.disabled) == is_first and bool(row.move_down_btn.disabled) == is_last:
+            return
+        row.move_up_btn.disabled = is_first
+        row.move_down_btn.disabled = is_last
+        try:
+            row.update()
+        except:
+            pass
 
     def on_duplicate_task(self, original_task_row):
         import time
@@ -2809,14 +4462,15 @@ class AgendaTab(ft.Column):
         except:
             pass
 
+    @metrics.timed("tab.save_task")
     def on_save_task(self, row, data):
         is_new_task = not row.db_id
 
         # Save or update the task in the database
         if is_new_task:
-            row.db_id = db.add_task(self.tab_name, data["title"], data["task"], data["start_date"], data["end_date"], data["status"], data["priority"])
+            row.db_id = row.model.id = db.add_task(self.tab_name, data["title"], data["task"], data["start_date"], data["end_date"], data["status"], data["priority"], row.model.position)
         else:
-            db.update_task(row.db_id, data["title"], data["task"], data["start_date"], data["end_date"], data["status"], data["priority"], self.tab_name)
+            db.writes.submit(("task", row.db_id), db.update_task, row.db_id, data["title"], data["task"], data["start_date"], data["end_date"], data["status"], data["priority"])
 
         # If it was a new task, update its UI now that it has a database ID
         if is_new_task and row.db_id:
@@ -2824,6 +4478,7 @@ class AgendaTab(ft.Column):
             row.duplicate_btn.disabled = False
             row.display_id_text.value = f"#{row.db_id}"
             row.display_id_text.visible = True
+            row.key = f"task-{row.db_id}"
             try: row.update()
             except: pass
 
@@ -2850,23 +4505,27 @@ class AgendaTab(ft.Column):
         try: self.page.update()
         except: pass
 
+    @metrics.timed("tab.delete_task")
     def confirm_delete_task(self):
-        row = self.task_to_delete
-        if row:
-            if row.db_id:
-                db.delete_task(row.db_id)
-            for lst in (self.ongoing_list, self.complete_list):
-                if row in lst.controls:
-                    try: lst.controls.remove(row)
-                    except: pass
-        self.task_to_delete = None
-        self.delete_task_dialog.open = False
-        self.update_overview_stats()
-        self.update_arrow_states()
-        self._populate_chart_selectors()
-        self._update_chart()
-        try: self.page.update()
-        except: pass
+        with self._ui_batch("confirm_delete_task"):
+            row = self.task_to_delete
+            if row:
+                if row.db_id:
+                    db.delete_task(row.db_id)
+                self.store.remove(row.model)
+                self.rows.pop(row.model, None)
+                for lst in (self.ongoing_list, self.complete_list):
+                    if row in lst.controls:
+                        try: lst.controls.remove(row)
+                        except: pass
+            self.task_to_delete = None
+            self.delete_task_dialog.open = False
+            self.update_overview_stats()
+            self.update_arrow_states()
+            self._populate_chart_selectors()
+            self._update_chart()
+            try: self.page.update()
+            except: pass
 
     def cancel_delete_task(self):
         self.task_to_delete = None
@@ -2874,32 +4533,36 @@ class AgendaTab(ft.Column):
         try: self.page.update()
         except: pass
 
+    @metrics.timed("tab.move_task")
     def move_task(self, row):
         # Determine source and target lists
         source_list = self.complete_list if row.status_field.value == "Ongoing" else self.ongoing_list
         target_list = self.ongoing_list if row.status_field.value == "Ongoing" else self.complete_list
 
-        # Remove from the source list
-        if row in source_list.controls:
-            try:
-                source_list.controls.remove(row)
-            except ValueError:
-                pass
+        with self._ui_batch("move_task"):
+            # Remove from the source list
+            if row in source_list.controls:
+                try:
+                    source_list.controls.remove(row)
+                except ValueError:
+                    pass
 
-        # Add to the top of the target list
-        target_list.controls.insert(0, row)
+            # Add to the top of the target list
+            self._show_top(target_list)
+            self._place_task(row.model, None, self._first_task(target_list, exclude=row.model))
+            target_list.controls.insert(0, row)
 
-        self.update_overview_stats()
-        self.update_arrow_states()
-        self._populate_chart_selectors()
-        self._update_chart()
-        
-        # Update both lists involved in the move
-        try:
-            source_list.update()
-            target_list.update()
-        except Exception:
-            pass
+            self.update_overview_stats()
+            self.update_arrow_states()
+            self._populate_chart_selectors()
+            self._update_chart()
+            
+            # Update both lists involved in the move
+            try:
+                source_list.update()
+                target_list.update()
+            except Exception:
+                pass
 
     def on_task_status_change(self, row):
         self.move_task(row)
@@ -2911,6 +4574,9 @@ class AgendaApp(ft.Column):
         super().__init__(spacing=12, expand=True)
         self.page = page
 
+        # Carrega todas as configurações de uma vez; o resto do app lê da memória
+        db.settings.load()
+
         # Get DPI setting, default to "Auto" (0.0) for first run
         self.dpi_scale_setting = db.get_setting('dpi_scale', '0.0')
 
@@ -2922,19 +4588,23 @@ class AgendaApp(ft.Column):
             self.dpi_scale = float(self.dpi_scale_setting)
 
         self.scale_func = lambda value: int(value * self.dpi_scale)
+        self.startup_metrics = {}
+        self._ui_batch_state = None
+        # ação -> {"batches", "requested", "sent"}: updates pedidos vs. enviados por ação do usuário
+        self.ui_update_counts = {}
 
         self.tabs = ft.Tabs(selected_index=0, scrollable=True, expand=True)
-        self.auto_save_enabled = db.get_setting('auto_save', 'False') == 'True'
-        self.theme_name = db.get_setting('theme', 'Dracula')
-        self.base_font_size = int(db.get_setting('font_size', '12'))
-        self.carousel_show_progress = db.get_setting('carousel_show_progress', 'True') == 'True'
-        self.carousel_show_total = db.get_setting('carousel_show_total', 'True') == 'True'
-        self.carousel_show_ongoing = db.get_setting('carousel_show_ongoing', 'True') == 'True'
-        self.carousel_show_completed = db.get_setting('carousel_show_completed', 'True') == 'True'
-        self.carousel_show_overdue = db.get_setting('carousel_show_overdue', 'True') == 'True'
-        self.carousel_speed = int(db.get_setting('carousel_speed', '5'))
-        self.translucency_enabled = db.get_setting('translucency_enabled', 'False') == 'True'
-        self.translucency_level = int(db.get_setting('translucency_level', '80'))
+        self.auto_save_enabled = db.settings.get_bool('auto_save', False)
+        self.theme_name = db.settings.get('theme', 'Dracula')
+        self.base_font_size = db.settings.get_int('font_size', 12)
+        self.carousel_show_progress = db.settings.get_bool('carousel_show_progress', True)
+        self.carousel_show_total = db.settings.get_bool('carousel_show_total', True)
+        self.carousel_show_ongoing = db.settings.get_bool('carousel_show_ongoing', True)
+        self.carousel_show_completed = db.settings.get_bool('carousel_show_completed', True)
+        self.carousel_show_overdue = db.settings.get_bool('carousel_show_overdue', True)
+        self.carousel_speed = db.settings.get_int('carousel_speed', 5)
+        self.translucency_enabled = db.settings.get_bool('translucency_enabled', False)
+        self.translucency_level = db.settings.get_int('translucency_level', 80)
         self.settings_dialog = SettingsDialog(
             on_auto_save_toggle=self.toggle_auto_save,
             initial_value=self.auto_save_enabled,
@@ -2964,9 +4634,27 @@ class AgendaApp(ft.Column):
         
         self.settings_btn = ft.IconButton(icon=ft.Icons.SETTINGS, tooltip="Settings", on_click=self.open_settings_dialog)
         self.pin_switch = ft.Switch(value=False, on_change=self.toggle_pin, tooltip="Pin window open")
+        # Aceso enquanto houver escritas na fila do db.writes
+        self.pending_writes_icon = ft.Icon(ft.Icons.SYNC, color=ft.Colors.AMBER, size=self.scale_func(18), visible=False)
+        db.writes.listeners.append(self._on_pending_writes)
+        db.writes.error_listeners.append(self._on_write_failed)
+        # Buscas rodam numa thread própria: o flush da fila e o FTS não podem atrasar os timers do scheduler
+        self._search_queries = queue.Queue()
+        self._search_thread = None
+        self.search_bar = ft.SearchBar(
+            bar_hint_text="Search tasks",
+            view_hint_text="Title, description or checklist text",
+            bar_leading=ft.Icon(ft.Icons.SEARCH),
+            on_change=self._on_search_change,
+            on_submit=self._on_search_change,
+            controls=[],
+            width=self.scale_func(220),
+        )
         self.header = ft.Row([
             ft.Text(f"{APP_NAME}", style=ft.TextThemeStyle.HEADLINE_SMALL),
             ft.Container(expand=True), 
+            self.search_bar,
+            self.pending_writes_icon,
             self.settings_btn, 
             self.pin_switch, self.add_tab_btn
         ])
@@ -3061,6 +4749,7 @@ class AgendaApp(ft.Column):
         db.set_setting('theme', theme_name)
         self.apply_theme(theme_name)
 
+    @metrics.timed("app.apply_theme")
     def apply_theme(self, theme_name):
         self.theme_name = theme_name
 
@@ -3113,13 +4802,87 @@ class AgendaApp(ft.Column):
             self.page.theme = DRACULA_THEME
             self.page.dark_theme = DRACULA_THEME
         
-        for tab in self.tabs.tabs:
-            if isinstance(tab.content, AgendaTab):
-                tab.content.update_theme_colors()
-                for task_row in (tab.content.ongoing_list.controls + tab.content.complete_list.controls):
-                    if isinstance(task_row, TaskRow):
+        with self.ui_batch("apply_theme"):
+            for tab in self.tabs.tabs:
+                if isinstance(tab.content, AgendaTab):
+                    tab.content.update_theme_colors()
+                    for task_row in list(tab.content.rows.values()):
                         task_row.update_theme_colors()
-        self.page.update()
+            self.page.update()
+
+    def _on_search_change(self, e):
+        text = e.control.value or ""
+        scheduler.call_later(0.15, lambda: self._queue_search(text), key=("search", id(self)))
+
+    def _queue_search(self, text):
+        self._search_queries.put(text)
+        if self._search_thread is None:
+            self._search_thread = threading.Thread(target=self._run_searches, daemon=True)
+            self._search_thread.start()
+
+    def _run_searches(self):
+        while True:
+            text = self._search_queries.get()
+            # Só a busca mais recente importa
+            while not self._search_queries.empty():
+                text = self._search_queries.get_nowait()
+            try:
+                results = db.search_tasks(text) if text.strip() else []
+            except Exception as e:
+                print(f"Error searching tasks: {e}")
+                continue
+            if self._search_queries.empty():
+                self._show_search_results(text, results)
+
+    def _show_search_results(self, text, results):
+        tiles = [
+            ft.ListTile(
+                leading=ft.Icon(ft.Icons.LOOP if r["status"] == "Ongoing" else ft.Icons.CHECK_CIRCLE_OUTLINE,
+                                color=ft.Colors.ORANGE if r["status"] == "Ongoing" else ft.Colors.GREEN),
+                title=ft.Text(r["title"] or f"#{r['id']}", no_wrap=True),
+                subtitle=ft.Text(f"{r['tab_name']} · {r['snippet']}", no_wrap=True, size=self.scale_func(11)),
+                on_click=lambda e, r=r: self.open_search_result(r),
+            )
+            for r in results
+        ]
+        if text.strip() and not tiles:
+            tiles = [ft.ListTile(title=ft.Text("No matching tasks"), disabled=True)]
+        self.search_bar.controls = tiles
+        try: self.search_bar.update()
+        except: pass
+
+    def open_search_result(self, result):
+        """Selects the result's tab and scrolls to its task."""
+        self.search_bar.close_view(self.search_bar.value)
+        for index, tab in enumerate(self.tabs.tabs):
+            if isinstance(tab.content, AgendaTab) and tab.content.tab_name == result["tab_name"]:
+                self.tabs.selected_index = index
+                self._on_tab_change()
+                try: self.tabs.update()
+                except: pass
+                tab.content.reveal_task(result["id"])
+                return
+
+    def _on_pending_writes(self, count):
+        visible = count > 0
+        changes = f"{count} change{'s' if count != 1 else ''}"
+        # Banco travado por outra instância/antivírus: as mudanças continuam na fila até conseguir gravar
+        retrying = db.writes.retry_delay > 0
+        tooltip = f"Database is busy, retrying {changes}..." if retrying else f"Saving {changes}..."
+        color = ft.Colors.RED if retrying else ft.Colors.AMBER
+        if (visible, tooltip, color) == (self.pending_writes_icon.visible, self.pending_writes_icon.tooltip, self.pending_writes_icon.color):
+            return
+        self.pending_writes_icon.visible = visible
+        self.pending_writes_icon.tooltip = tooltip
+        self.pending_writes_icon.color = color
+        try: self.pending_writes_icon.update()
+        except: pass
+
+    def _on_write_failed(self, key, error):
+        self.page.snack_bar = ft.SnackBar(ft.Text(f"A change could not be saved: {error}"), bgcolor=ft.Colors.RED)
+        self.page.snack_bar.open = True
+        try: self.page.update()
+        except: pass
 
     def toggle_auto_save(self, e):
         self.auto_save_enabled = e.control.value
@@ -3130,6 +4893,10 @@ class AgendaApp(ft.Column):
 
     def change_dpi(self, new_scale):
         db.set_setting('dpi_scale', new_scale)
+        if float(new_scale) == 0.0:
+            # Voltar para "Auto" mede o DPI de novo no próximo start (o monitor pode ter mudado)
+            db.settings.delete('auto_dpi_scale')
+            db.settings.delete('auto_dpi_screen')
 
         # Show a message that a restart is required
         self.page.snack_bar = ft.SnackBar(ft.Text("Please restart the application to apply the new scaling."), bgcolor=ft.Colors.BLUE)
@@ -3146,39 +4913,118 @@ class AgendaApp(ft.Column):
         self.page.update()
 
     def start_notification_checker(self):
-        self.notification_checker_thread = threading.Thread(target=self.check_due_dates_periodically, daemon=True)
-        self.notification_checker_thread.start()
+        # Sem thread própria: o due_dates avisa na meia-noite em que alguma task muda
+        due_dates.listeners.append(self._on_tasks_due)
 
-    def check_due_dates_periodically(self):
-        while True:
-            time.sleep(3600)  # Check every hour
-            try:
-                if self.page:
-                    self.page.run_threadsafe(self.check_all_due_dates)
-            except Exception as e:
-                print(f"Error in periodic due date checker: {e}")
+    def _on_tasks_due(self, tasks):
+        """`due_dates` listener (scheduler thread): refreshes only the tasks whose badge changed."""
+        if not self.page:
+            return
+        if hasattr(self.page, 'run_threadsafe'):
+            self.page.run_threadsafe(lambda: self._refresh_due_tasks(tasks))
+        else:
+            self._refresh_due_tasks(tasks)
+
+    def _refresh_due_tasks(self, tasks):
+        by_store = {}
+        for task in tasks:
+            by_store.setdefault(task.store, []).append(task)
+        for tab in self.tabs.tabs:
+            agenda_tab = tab.content
+            # Todas as abas: o dia virou e os contadores de overdue também mudam
+            if isinstance(agenda_tab, AgendaTab):
+                agenda_tab.refresh_due_dates(tasks=by_store.get(agenda_tab.store, []))
+
+    def refresh_task_due_date(self, row):
+        """Recomputes and reschedules the due badge of one edited row."""
+        for tab in self.tabs.tabs:
+            agenda_tab = tab.content
+            if isinstance(agenda_tab, AgendaTab) and agenda_tab.store is row.model.store:
+                agenda_tab.refresh_due_dates([row])
+                return
 
     def check_all_due_dates(self):
         if not self.page: return
 
         for tab in self.tabs.tabs:
             agenda_tab = tab.content
-            if isinstance(agenda_tab, AgendaTab):
-                for task_row in agenda_tab.ongoing_list.controls:
-                    if not isinstance(task_row, TaskRow) or task_row.status_field.value != "Ongoing":
-                        task_row.set_notification_status(None) # Reset color
-                        continue
+            if isinstance(agenda_tab, AgendaTab) and agenda_tab.is_loaded:
+                agenda_tab.refresh_due_dates()
 
-                    end_date_str = task_row.end_date_field.value
-                    if not (end_date_str and (end_date := TaskRow._parse_date(end_date_str))):
-                        task_row.set_notification_status(None) # Reset color
-                        continue
+    @contextmanager
+    def ui_batch(self, action="batch"):
+        """Collects every page/control update made inside the block and sends them as one update at the end.
 
-                    days_diff = (end_date - datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)).days
-                    status = "overdue" if days_diff < 0 else "upcoming" if 0 <= days_diff <= 3 else None
-                    
-                    task_row.set_notification_status(status, days_diff)
-                agenda_tab.update_overview_stats()
+        Nested batches join the outermost one. Only the thread that opened the
+        batch is collected: updates from the carousel, the hover watcher, the
+        scheduler or the animations go straight through.
+        """
+        page = self.page
+        if self._ui_batch_state is not None or page is None:
+            yield
+            return
+        state = self._ui_batch_state = {"controls": {}, "full": False, "requested": 0}
+        owner = threading.get_ident()
+        lock = threading.Lock()
+        previous = page.__dict__.get('update')
+        forward = previous or ft.Page.update.__get__(page)
+
+        def collect(*controls):
+            if threading.get_ident() != owner:
+                return forward(*controls)
+            with lock:
+                state["requested"] += 1
+                if not controls:
+                    state["full"] = True
+                for control in controls:
+                    state["controls"][id(control)] = control
+
+        page.update = collect
+        try:
+            yield
+        finally:
+            # Volta para Page.update (ou para o que já estava na instância)
+            if previous is None:
+                del page.update
+            else:
+                page.update = previous
+            self._ui_batch_state = None
+            with lock:
+                state = {**state, "controls": dict(state["controls"])}
+            sent = self._flush_ui_batch(state)
+            counts = self.ui_update_counts.setdefault(action, {"batches": 0, "requested": 0, "sent": 0})
+            counts["batches"] += 1
+            counts["requested"] += state["requested"]
+            counts["sent"] += sent
+            if DEBUG:
+                print(f"ui_batch {action}: {state['requested']} updates requested, {sent} sent")
+
+    def _flush_ui_batch(self, state):
+        if state["full"]:
+            try: self.page.update()
+            except: pass
+            return 1
+        collected = state["controls"]
+        controls = []
+        for control in collected.values():
+            # Já removido da página, ou coberto pelo update de um ancestral também na lista
+            if control.page is None:
+                continue
+            parent = control.parent
+            while parent is not None and id(parent) not in collected:
+                parent = parent.parent
+            if parent is None:
+                controls.append(control)
+        if not controls:
+            return 0
+        try:
+            self.page.update(*controls)
+        except Exception:
+            # Um control inválido não deve derrubar os outros
+            for control in controls:
+                try: self.page.update(control)
+                except: pass
+        return 1
 
     def toggle_pin(self, e):
         self.page.pinned = self.pin_switch.value
@@ -3203,7 +5049,9 @@ class AgendaApp(ft.Column):
         try: self.page.update()
         except: pass
 
+    @metrics.timed("app.load_tabs")
     def load_tabs(self):
+        started = time.perf_counter()
         tab_names = db.list_tabs()
         if not tab_names:
             db.add_tab("Tab 1"); tab_names = ["Tab 1"]
@@ -3213,14 +5061,73 @@ class AgendaApp(ft.Column):
             editable_label = EditableTabLabel(name, self.rename_tab, self.scale_func, self.base_font_size)
             tab = ft.Tab(content=tab_content, tab_content=editable_label)
             self.tabs.tabs.append(tab)
-        for t in self.tabs.tabs:
+        # Uma única carga em lote para todas as abas, em vez de N+1 consultas por aba.
+        # Só a aba visível constrói suas TaskRows agora; as outras ficam para depois.
+        tasks_by_tab = db.load_all_tasks()
+        if not self.tabs.selected_index or self.tabs.selected_index >= len(self.tabs.tabs):
+            self.tabs.selected_index = 0
+        for i, t in enumerate(self.tabs.tabs):
+            tasks = tasks_by_tab.get(t.content.tab_name, [])
             try:
-                t.content.load_tasks()
+                if i == self.tabs.selected_index:
+                    t.content.load_tasks(tasks)
+                else:
+                    t.content.defer_tasks(tasks)
             except Exception:
                 pass
+        self.tabs.on_change = self._on_tab_change
         try: self.tabs.update()
         except: pass
 
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.startup_metrics["load_tabs_ms"] = elapsed_ms
+        self.startup_metrics["tabs_deferred"] = len(self.tabs.tabs) - 1
+        if DEBUG:
+            print(f"load_tabs: {elapsed_ms:.0f} ms ({len(self.tabs.tabs)} tabs, {len(self.tabs.tabs) - 1} deferred)")
+        self._start_idle_hydration()
+
+    def _on_tab_change(self, e=None):
+        index = self.tabs.selected_index
+        if index is not None and 0 <= index < len(self.tabs.tabs):
+            agenda_tab = self.tabs.tabs[index].content
+            if isinstance(agenda_tab, AgendaTab) and not agenda_tab.is_loaded:
+                agenda_tab.ensure_loaded()
+                agenda_tab.refresh_due_dates()
+                try: agenda_tab.update()
+                except: pass
+
+    def _start_idle_hydration(self, delay=2.0, interval=0.3):
+        """Hydrates the remaining tabs one by one in the background after startup.
+
+        Runs on its own thread (Flet 0.28 has no way to post work to the UI
+        thread); each tab's `_load_lock` keeps it from racing a tab click.
+        """
+        def hydrate(agenda_tab):
+            agenda_tab.ensure_loaded()
+            agenda_tab.refresh_due_dates()
+            try: agenda_tab.update()
+            except: pass
+
+        def hydrate_pending():
+            time.sleep(delay)
+            started = time.perf_counter()
+            for tab in list(self.tabs.tabs):
+                agenda_tab = tab.content
+                # A aba pode ter sido aberta pelo usuário ou apagada nesse meio tempo;
+                # a selecionada fica com o _on_tab_change
+                tabs = self.tabs.tabs
+                if (not isinstance(agenda_tab, AgendaTab) or agenda_tab.is_loaded or tab not in tabs
+                        or tabs.index(tab) == self.tabs.selected_index):
+                    continue
+                try:
+                    hydrate(agenda_tab)
+                except Exception as e:
+                    print(f"Error hydrating tab '{agenda_tab.tab_name}': {e}")
+                time.sleep(interval)
+            self.startup_metrics["idle_hydration_ms"] = (time.perf_counter() - started) * 1000
+
+        threading.Thread(target=hydrate_pending, daemon=True).start()
+
     def _create_tab(self, tab_name):
         # Evita duplicar tab no DB se já existe (proteção extra)
         existing_tabs = db.list_tabs()
@@ -3244,7 +5151,6 @@ class AgendaApp(ft.Column):
 
     def add_new_tab(self, e=None):
         import time
-        import threading
         
         # Proteção contra execuções simultâneas
         if not hasattr(self, '_add_new_tab_busy'):
@@ -3260,10 +5166,9 @@ class AgendaApp(ft.Column):
             if time_diff < 0.5:  # 500ms mínimo entre criações de tab
                 return None
                 
-        # Cancela debounce anterior se existir
-        if hasattr(self, '_add_new_tab_debounce_timer'):
-            if self._add_new_tab_debounce_timer and self._add_new_tab_debounce_timer.is_alive():
-                return None  # Ignora cliques durante debounce
+        # Ignora cliques durante o debounce anterior
+        if scheduler.pending(("add_new_tab_update", id(self))):
+            return None
         
         # Marca como busy
         self._add_new_tab_busy = True
@@ -3282,23 +5187,16 @@ class AgendaApp(ft.Column):
             self._create_tab(new_tab_name)
             self.tabs.selected_index = len(self.tabs.tabs) - 1
             
-            # Debounce para tabs.update() com cancelamento de timer anterior
+            # Debounce para tabs.update()
             def debounced_update():
-                time.sleep(0.2)  # 200ms debounce
                 try:
                     self.tabs.update()
                 except:
                     pass
                 finally:
                     self._add_new_tab_busy = False  # Libera busy flag após update
-                    
-            # Cancela timer anterior e cria novo
-            if hasattr(self, '_add_new_tab_debounce_timer') and self._add_new_tab_debounce_timer and self._add_new_tab_debounce_timer.is_alive():
-                # Timer anterior ainda rodando, será cancelado automaticamente
-                pass
-                
-            self._add_new_tab_debounce_timer = threading.Timer(0.2, debounced_update)
-            self._add_new_tab_debounce_timer.start()
+
+            scheduler.call_later(0.2, debounced_update, key=("add_new_tab_update", id(self)))
             
         except Exception as ex:
             self._add_new_tab_busy = False  # Libera busy em caso de erro
@@ -3328,10 +5226,14 @@ class AgendaApp(ft.Column):
                 tab_to_remove = tab; break
         if tab_to_remove:
             db.delete_tab(tab_name)
+            if isinstance(tab_to_remove.content, AgendaTab):
+                due_dates.untrack(tab_to_remove.content.store)
             try: self.tabs.tabs.remove(tab_to_remove)
             except: pass
             if self.tabs.selected_index >= len(self.tabs.tabs):
                 self.tabs.selected_index = len(self.tabs.tabs) - 1
+            # A aba que assumiu a seleção pode ainda estar adiada (só com o placeholder)
+            self._on_tab_change()
             try: self.tabs.update()
             except: pass
 
@@ -3397,6 +5299,7 @@ class AnimationManager:
         # Verifica limite de animações simultâneas
         if self._active_animations >= self._max_concurrent_animations:
             # Se está no limite, executa swap instantâneo sem animação
+            metrics.record("animation.skipped")
             def _instant_swap():
                 try:
                     if new_content is not None:
@@ -3449,7 +5352,8 @@ class AnimationManager:
         async def animation_wrapper():
             self._active_animations += 1
             try:
-                await coro_factory(target_control, new_content, duration, **kwargs)
+                with metrics.timed(f"animation.{name}"):
+                    await coro_factory(target_control, new_content, duration, **kwargs)
             finally:
                 self._active_animations -= 1
 
@@ -3777,7 +5681,7 @@ class AnimationManager:
         def _scroll():
             try:
                 curve = kwargs.get('curve', ft.AnimationCurve.EASE_IN_OUT)
-                target.scroll_to(duration=int(duration * 1000), curve=curve)
+                target.scroll_to(key=kwargs.get('key'), duration=int(duration * 1000), curve=curve)
             except Exception:
                 pass
 
@@ -4220,6 +6124,120 @@ class AnimationManager:
         _safe_update(_settle)
 
 
+class HoverWatcher:
+    """Decides when the window expands or shrinks from where the cursor is.
+
+    Hover enter/leave events of the root container drive it. A polling thread
+    stays as a fallback for what Flet doesn't report (the cursor leaving during
+    an animation, a picker closing with the cursor outside): it starts at
+    `min_interval` and backs off up to `max_interval` while the decision
+    inputs (inside, window size, toggling allowed) stay the same. Hover events
+    reset it to the fast interval. `wakeups` counts poll iterations.
+    """
+
+    LARGE_WINDOW_MARGIN = 15  # margem em px para o cursor não fechar a janela grande na borda
+
+    def __init__(self, get_position, get_bounds, is_large, can_toggle, on_expand, on_shrink,
+                 min_interval=0.1, max_interval=2.0, backoff=1.5, leave_delay=0.25):
+        self._get_position = get_position
+        self._get_bounds = get_bounds
+        self._is_large = is_large
+        self._can_toggle = can_toggle
+        self._on_expand = on_expand
+        self._on_shrink = on_shrink
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.leave_delay = leave_delay
+        self.wakeups = 0
+        self._last_request = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        scheduler.cancel(('hover_leave', id(self)))
+
+    def on_hover(self, e):
+        """`on_hover` handler of the root container: e.data is "true" on enter and "false" on leave."""
+        key = ('hover_leave', id(self))
+        if e.data == "true":
+            scheduler.cancel(key)
+            self._evaluate(True)
+        else:
+            # Pequena espera antes de reduzir: faz o papel da margem do poll
+            scheduler.call_later(self.leave_delay, self._on_leave, key=key)
+        # Confere logo em seguida pelo poll, caso o evento tenha vindo no meio de uma animação
+        self._wake.set()
+
+    def _on_leave(self):
+        # Um dialog ou a view do SearchBar por cima também gera "leave": quem decide é a posição do cursor
+        try:
+            is_large = self._is_large()
+            inside = self._contains(self._get_position(), self._get_bounds(), is_large)
+        except Exception as e:
+            print(f"Mouse check error: {e}")
+            return
+        self._evaluate(inside)
+
+    def _contains(self, position, bounds, is_large):
+        mx, my = position
+        x0, y0, width, height = bounds
+        margin = self.LARGE_WINDOW_MARGIN if is_large else 0
+        return (x0 - margin) <= mx <= (x0 + width + margin) and (y0 - margin) <= my <= (y0 + height + margin)
+
+    def _evaluate(self, inside):
+        with self._lock:
+            # Não reduz com a janela fixada, animando ou com um picker aberto
+            if not self._can_toggle():
+                return
+            is_large = self._is_large()
+            should_expand = inside and not is_large
+            should_shrink = not inside and is_large
+            if should_expand and self._last_request != 'expanding':
+                self._last_request = 'expanding'
+                self._on_expand()
+            elif should_shrink and self._last_request != 'shrinking':
+                self._last_request = 'shrinking'
+                self._on_shrink()
+            elif not should_expand and not should_shrink:
+                self._last_request = None
+
+    def _run(self):
+        interval = self.min_interval
+        last_sample = None
+        while not self._stop.is_set():
+            if self._wake.wait(interval):
+                self._wake.clear()
+                interval = self.min_interval
+                if self._stop.is_set():
+                    break
+            self.wakeups += 1
+            try:
+                can_toggle = self._can_toggle()
+                is_large = self._is_large()
+                inside = self._contains(self._get_position(), self._get_bounds(), is_large) if can_toggle else None
+                sample = (inside, is_large, can_toggle)
+                if sample == last_sample:
+                    interval = min(interval * self.backoff, self.max_interval)
+                    continue
+                last_sample = sample
+                interval = self.min_interval
+                if can_toggle:
+                    self._evaluate(inside)
+            except Exception as e:
+                print(f"Mouse check error: {e}")
+
+
 def main(page: ft.Page):
     page.title = "Todo APP"
     page.window.title_bar_hidden = True
@@ -4227,9 +6245,15 @@ def main(page: ft.Page):
     page.window.resizable = False
     page.window.always_on_top = True
 
-    db.init_db()
-    app = AgendaApp(page)
+    metrics.instrument_page(page)
+    with startup_phase("init_db"):
+        db.init_db()
+    # Remove pastas de anexos que sobraram de uma exclusão interrompida
+    db.attachment_cleaner.sweep()
+    with startup_phase("app_init"):
+        app = AgendaApp(page)
     page.app_instance = app
+    metrics.add_context(startup=STARTUP_TRACE, ui_batches=app.ui_update_counts)
 
     scale_func = app.scale_func
     page.window.width = scale_func(100)
@@ -4257,11 +6281,14 @@ def main(page: ft.Page):
     page.mini_icon.visible = False  # começa invisível
 
     stack = ft.Stack(expand=True, controls=[page.app_container, page.mini_icon])
-    page.add(stack)
+    # Container raiz: seus eventos de hover (entrar/sair da janela) disparam expandir/reduzir
+    page.root_container = ft.Container(content=stack, expand=True)
+    page.add(page.root_container)
 
-    app.load_tabs()
-    app.check_all_due_dates()
-    app.apply_translucency()
+    with startup_phase("load_tabs"):
+        app.load_tabs()
+        app.check_all_due_dates()
+        app.apply_translucency()
 
     page.pinned = False
     page.is_animating = False
@@ -4408,63 +6435,30 @@ def main(page: ft.Page):
         page.update()
 
     # --- Checagem do mouse ---
-    last_state = None  # Track last window state to prevent unnecessary toggles
-    
-    def check_mouse():
-        nonlocal last_state
-        
-        while True:
-            time.sleep(0.1)  # Check 10 times per second for stability
-            try:
-                # Don't shrink if pinned, animating, or a picker is open
-                if page.pinned or page.is_animating or page.is_picker_open or page.is_file_picker_open:
-                    continue
-
-                mx, my = pyautogui.position()
-                x0, y0 = page.window.left, page.window.top
-                x1, y1 = x0 + page.window.width, y0 + page.window.height
-
-                is_large_window = page.app_container.opacity == 1
-                
-                # Add margins to prevent flickering when cursor is near edges
-                if not is_large_window:
-                    # For small window, use precise rectangular detection without expansion
-                    # Only expand when cursor is actually inside the small window
-                    inside = x0 <= mx <= x1 and y0 <= my <= y1
-                else:
-                    # For large window, add margin to prevent immediate closing
-                    margin = 15  # 15px margin around window
-                    inside = (x0 - margin) <= mx <= (x1 + margin) and (y0 - margin) <= my <= (y1 + margin)
-
-                # Only trigger if state actually changed
-                current_state = 'large' if is_large_window else 'small'
-                should_expand = inside and not is_large_window
-                should_shrink = not inside and is_large_window
-                
-                if should_expand and last_state != 'expanding':
-                    last_state = 'expanding'
-                    # Use run_threadsafe to prevent UI update crashes from a background thread
-                    if hasattr(page, "run_threadsafe"):
-                        page.run_threadsafe(expand)
-                    else:
-                        expand()
-                elif should_shrink and last_state != 'shrinking':
-                    last_state = 'shrinking'
-                    if hasattr(page, "run_threadsafe"):
-                        page.run_threadsafe(shrink)
-                    else:
-                        shrink()
-                elif not should_expand and not should_shrink:
-                    # Reset state when no action needed
-                    if last_state in ['expanding', 'shrinking']:
-                        last_state = current_state
-
-            except Exception as e:
-                print(f"Mouse check error: {e}")
+    def run_on_ui(action):
+        # Use run_threadsafe to prevent UI update crashes from a background thread
+        if hasattr(page, "run_threadsafe"):
+            page.run_threadsafe(action)
+        else:
+            action()
+
+    hover_watcher = HoverWatcher(
+        get_position=get_cursor_position,
+        get_bounds=lambda: (page.window.left, page.window.top, page.window.width, page.window.height),
+        is_large=lambda: page.app_container.opacity == 1,
+        can_toggle=lambda: not (page.pinned or page.is_animating or page.is_picker_open or page.is_file_picker_open),
+        on_expand=lambda: run_on_ui(expand),
+        on_shrink=lambda: run_on_ui(shrink),
+    )
+    page.root_container.on_hover = hover_watcher.on_hover
+    page.hover_watcher = hover_watcher
 
-    initial_shrink()
-    page.window.visible = True
-    page.update()
+    with startup_phase("initial_shrink"):
+        initial_shrink()
+        page.window.visible = True
+        page.update()
+    report_startup()
+    app.startup_metrics.update(STARTUP_TRACE)
     
     # Define o ícone da janela após ela ser criada
     def set_icon_delayed():
@@ -4497,8 +6491,15 @@ def main(page: ft.Page):
     # Executa a definição do ícone em background
     threading.Thread(target=set_icon_delayed, daemon=True).start()
 
-    threading.Thread(target=check_mouse, daemon=True).start()
+    hover_watcher.start()
 
 
 if __name__ == "__main__":
-    ft.app(target=main)
\ No newline at end of file
+    try:
+        ft.app(target=main)
+    finally:
+        # Grava o que ainda estiver na fila de escrita antes de sair
+        db.close()
+        # AGENDA_METRICS_EXPORT=<arquivo.json> grava as métricas da sessão para comparar versões
+        if os.environ.get("AGENDA_METRICS_EXPORT"):
+            metrics.export(os.environ["AGENDA_METRICS_EXPORT"])
\ No newline at end of file
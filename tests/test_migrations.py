@@ -0,0 +1,63 @@
+import os
+import sqlite3
+import tempfile
+
+# main.py resolve APP_DATA_DIR a partir de APPDATA na importação
+os.environ.setdefault('APPDATA', tempfile.gettempdir())
+
+import main
+from main import db
+
+
+def _use_database(directory):
+    db.close()
+    main.APP_DATA_DIR = directory
+    main.DB_PATH = os.path.join(directory, 'agenda.db')
+    main.ATTACHMENTS_DIR = os.path.join(directory, 'attachments')
+
+
+def test_migrates_v0_database_with_null_tab_name(tmp_path):
+    _use_database(str(tmp_path))
+    # Schema da versão sem migrações (user_version 0), com uma task sem aba
+    conn = sqlite3.connect(main.DB_PATH)
+    conn.executescript("""
+        CREATE TABLE tabs (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT UNIQUE);
+        CREATE TABLE tasks (id INTEGER PRIMARY KEY AUTOINCREMENT, tab_name TEXT, title TEXT, task TEXT,
+                            start_date TEXT, end_date TEXT, status TEXT, priority TEXT);
+        CREATE TABLE attachments (id INTEGER PRIMARY KEY AUTOINCREMENT, task_id INTEGER, file_path TEXT,
+                                  FOREIGN KEY(task_id) REFERENCES tasks(id));
+        CREATE TABLE checklist_items (id INTEGER PRIMARY KEY AUTOINCREMENT, task_id INTEGER, text TEXT,
+                                      is_checked INTEGER, FOREIGN KEY(task_id) REFERENCES tasks(id));
+        CREATE TABLE settings (key TEXT PRIMARY KEY, value TEXT);
+        INSERT INTO tabs (name) VALUES ('Home');
+        INSERT INTO tasks (tab_name, title, status, priority) VALUES ('Home', 'kept', 'Ongoing', 'Normal');
+        INSERT INTO tasks (tab_name, title, status, priority) VALUES (NULL, 'orphan', 'Ongoing', NULL);
+    """)
+    conn.close()
+    try:
+        db.init_db()
+        with db.connection() as conn:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            rows = conn.execute("SELECT title, tab_id, position FROM tasks ORDER BY id").fetchall()
+        assert version == len(main.SCHEMA_MIGRATIONS)
+        assert [title for title, _, _ in rows] == ["kept", "orphan"]
+        assert rows[1][1] is None and rows[0][2] > 0 and rows[1][2] > 0
+        assert [t["title"] for t in db.load_all_tasks()["Home"]] == ["kept"]
+    finally:
+        db.close()
+
+
+def test_queued_task_save_keeps_tab_after_rename(tmp_path):
+    _use_database(str(tmp_path))
+    try:
+        db.init_db()
+        db.add_tab("Work")
+        task_id = db.add_task("Work", "report", "", "", "", "Ongoing", "Normal")
+        # Save na fila quando a aba é renomeada: grava depois do rename
+        db.writes.submit(("task", task_id), db.update_task, task_id, "report v2", "", "", "", "Ongoing", "Normal")
+        with db.connection() as conn:
+            conn.execute("UPDATE tabs SET name = 'Office' WHERE name = 'Work'")
+        db.writes.flush()
+        assert [t["title"] for t in db.load_all_tasks()["Office"]] == ["report v2"]
+    finally:
+        db.close()
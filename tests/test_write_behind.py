@@ -0,0 +1,84 @@
+import os
+import sqlite3
+import tempfile
+import threading
+
+# main.py resolve APP_DATA_DIR a partir de APPDATA na importação
+os.environ.setdefault('APPDATA', tempfile.gettempdir())
+
+import main
+
+
+def _queue(tmp_path):
+    pool = main.ConnectionPool(str(tmp_path / "writes.db"), timeout=0.1)
+    with pool.connection() as conn:
+        conn.execute("CREATE TABLE log (value TEXT NOT NULL)")
+    writes = main.WriteBehindQueue(pool.connection, interval=60)
+
+    def insert(value):
+        with pool.connection() as conn:
+            conn.execute("INSERT INTO log (value) VALUES (?)", (value,))
+
+    def values():
+        with pool.connection() as conn:
+            return [row[0] for row in conn.execute("SELECT value FROM log ORDER BY rowid")]
+    return writes, insert, values
+
+
+def test_resubmitted_key_moves_after_earlier_writes(tmp_path):
+    writes, insert, values = _queue(tmp_path)
+    writes.submit(("task_position", 1), insert, "old position")
+    writes.submit("rebalance", insert, "rebalance")
+    writes.submit(("task_position", 1), insert, "new position")
+    assert writes.flush() == 2
+    assert values() == ["rebalance", "new position"]
+
+
+def test_failing_write_does_not_block_the_others(tmp_path):
+    writes, insert, values = _queue(tmp_path)
+    dropped = []
+    writes.error_listeners.append(lambda key, error: dropped.append((key, type(error))))
+    writes.submit("a", insert, "a")
+    writes.submit("bad", insert, None)  # NOT NULL
+    writes.submit("b", insert, "b")
+    assert writes.flush() == 2
+    assert values() == ["a", "b"]
+    assert len(writes) == 0
+    assert dropped == [("bad", sqlite3.IntegrityError)]
+
+
+def test_locked_database_keeps_writes_queued(tmp_path):
+    writes, insert, values = _queue(tmp_path)
+    other = sqlite3.connect(str(tmp_path / "writes.db"), isolation_level=None)
+    other.execute("BEGIN IMMEDIATE")
+    writes.submit("edit", insert, "edit")
+    assert writes.flush() == 0
+    assert len(writes) == 1 and writes.retry_delay > 0
+    other.execute("ROLLBACK")
+    other.close()
+    assert writes.flush() == 1
+    assert values() == ["edit"] and writes.retry_delay == 0
+
+
+def test_flush_waits_for_the_batch_in_flight(tmp_path):
+    writes, insert, values = _queue(tmp_path)
+    started, release = threading.Event(), threading.Event()
+
+    def slow_insert(value):
+        started.set()
+        release.wait(5)
+        insert(value)
+
+    writes.submit("slow", slow_insert, "saved")
+    flusher = threading.Thread(target=writes.flush)
+    flusher.start()
+    started.wait(5)
+    result = []
+    reader = threading.Thread(target=lambda: result.append((writes.flush(), values())))
+    reader.start()
+    reader.join(0.2)
+    assert reader.is_alive()
+    release.set()
+    flusher.join(5)
+    reader.join(5)
+    assert result == [(0, ["saved"])]